@@ -4,6 +4,17 @@ import Negotiation from "../models/NegotiationModel.js";
 const PYTHON_API_BASE_URL =
   process.env.PYTHON_API_BASE_URL || "http://127.0.0.1:8000";
 
+const ROUND_PARAMS = { include: "offer,fitness,timing", history: "none" };
+const DEFAULT_WEIGHTS = { user: 0.5, manufacturer: 0.5 };
+
+const toStoredResult = (r) => ({
+  manufacturerId: r.manufacturer_id,
+  algorithms: r.algorithms,
+  winner: r.winner,
+  winningOffer: r.winning_offer,
+  comparisonMetrics: r.comparison_metrics,
+});
+
 /**
  * @route   POST /api/negotiation/start
  * @desc    Run the MPSO/ABC/GA comparison for a user negotiation request
@@ -37,27 +48,24 @@ export const startNegotiation = async (req, res) => {
         deliveryTimeline,
       },
       manufacturers,
-      weights: weights || { user: 0.5, manufacturer: 0.5 },
+      weights: weights || DEFAULT_WEIGHTS,
     };
 
-    const response = await axios.post(
-      `${PYTHON_API_BASE_URL}/compare-algorithms`,
-      payload
-    );
+    // Open an optimizer session so later rounds only send what changed.
+    // Ask only for the fields stored below; skip MPSO round history entirely.
+    const response = await axios.post(`${PYTHON_API_BASE_URL}/sessions`, payload, {
+      params: ROUND_PARAMS,
+    });
 
-    const results = response.data;
+    const { session_id: optimizerSessionId, results } = response.data;
 
     const session = await Negotiation.create({
       userId: req.user._id,
       userRequest: payload.user,
       manufacturers,
-      results: results.map((r) => ({
-        manufacturerId: r.manufacturer_id,
-        algorithms: r.algorithms,
-        winner: r.winner,
-        winningOffer: r.winning_offer,
-        comparisonMetrics: r.comparison_metrics,
-      })),
+      weights: payload.weights,
+      optimizerSessionId,
+      results: results.map(toStoredResult),
     });
 
     res.status(200).json({
@@ -71,6 +79,124 @@ export const startNegotiation = async (req, res) => {
   }
 };
 
+/**
+ * Apply a round's delta to the stored negotiation inputs, merging the way
+ * PATCH /sessions does. Returns the next inputs and the ids removed.
+ */
+const applyDelta = (negotiation, { user, manufacturers, remove, weights }) => {
+  const byId = new Map(negotiation.manufacturers.map((m) => [m.id, m]));
+  for (const change of manufacturers) {
+    const current = byId.get(change.id) || {};
+    byId.set(change.id, {
+      ...current,
+      ...change,
+      initialOffer: { ...current.initialOffer, ...change.initialOffer },
+    });
+  }
+  const removed = remove.filter((id) => byId.delete(id));
+  return {
+    user: { ...negotiation.userRequest, ...user },
+    manufacturers: [...byId.values()],
+    weights: { ...(negotiation.weights || DEFAULT_WEIGHTS), ...weights },
+    removed,
+  };
+};
+
+/**
+ * Run the round on the negotiation's optimizer session. Sessions live in
+ * one Python worker's memory, so the session may be gone (expired, service
+ * restarted, or a worker without it answered): on a 404, or when there is
+ * no session yet, open a new one from the stored inputs with the delta
+ * applied, which re-optimizes every manufacturer.
+ */
+const runRound = async (negotiation, delta, next) => {
+  if (negotiation.optimizerSessionId) {
+    try {
+      const response = await axios.patch(
+        `${PYTHON_API_BASE_URL}/sessions/${negotiation.optimizerSessionId}`,
+        delta,
+        { params: ROUND_PARAMS }
+      );
+      return { ...response.data, reopened: false };
+    } catch (error) {
+      if (error.response?.status !== 404) {
+        throw error;
+      }
+    }
+  }
+  const unknown = delta.remove.filter((id) => !next.removed.includes(id));
+  if (unknown.length) {
+    const error = new Error("Unknown manufacturer ids");
+    error.response = { status: 422, data: { detail: `Unknown manufacturer ids: [${unknown}]` } };
+    throw error;
+  }
+  const response = await axios.post(
+    `${PYTHON_API_BASE_URL}/sessions`,
+    { user: next.user, manufacturers: next.manufacturers, weights: next.weights },
+    { params: ROUND_PARAMS }
+  );
+  return { ...response.data, removed: next.removed, reopened: true };
+};
+
+/**
+ * @route   PATCH /api/negotiation/:id
+ * @desc    Run the next round of a negotiation. The body holds only what
+ *          changed: `user` (changed request fields), `manufacturers`
+ *          (entries with an `id` plus changed constraints; new ids are
+ *          added), `remove` (manufacturer ids) and `weights`. Only the
+ *          affected manufacturers are re-optimized, unless the optimizer
+ *          session had to be re-opened (`reopened: true`).
+ * @access  Private (user only)
+ */
+export const updateNegotiation = async (req, res) => {
+  try {
+    const negotiation = await Negotiation.findOne({
+      _id: req.params.id,
+      userId: req.user._id,
+    });
+    if (!negotiation) {
+      return res.status(404).json({ error: "Negotiation not found" });
+    }
+
+    const { user, manufacturers, remove, weights } = req.body;
+    const delta = { user, manufacturers: manufacturers || [], remove: remove || [], weights };
+    const next = applyDelta(negotiation, delta);
+    const { session_id: optimizerSessionId, reoptimized, removed, results, reopened } =
+      await runRound(negotiation, delta, next);
+
+    // Store the round's inputs and merge its results into the stored ones.
+    negotiation.userRequest = next.user;
+    negotiation.manufacturers = next.manufacturers;
+    negotiation.weights = next.weights;
+    negotiation.optimizerSessionId = optimizerSessionId;
+    const updated = new Map(results.map((r) => [r.manufacturer_id, toStoredResult(r)]));
+    negotiation.results = [
+      ...negotiation.results.filter(
+        (r) => !updated.has(r.manufacturerId) && !removed.includes(r.manufacturerId)
+      ),
+      ...updated.values(),
+    ];
+    negotiation.rounds += 1;
+    await negotiation.save();
+
+    res.status(200).json({
+      message: "Negotiation round completed",
+      negotiationId: negotiation._id,
+      round: negotiation.rounds,
+      reoptimized,
+      removed,
+      reopened,
+      results,
+    });
+  } catch (error) {
+    if (error.response?.status === 422) {
+      return res.status(422).json({ error: error.response.data.detail });
+    }
+    console.error("Negotiation Round Error:", error.message);
+    res.status(500).json({ error: "Negotiation round failed" });
+  }
+};
+
 /**
  * @route   POST /api/negotiation
  * @desc    Pass-through proxy to the Python comparison endpoint.
@@ -44,6 +44,9 @@ const NegotiationSchema = new mongoose.Schema(
     },
     userRequest: { type: mongoose.Schema.Types.Mixed, required: true },
     manufacturers: { type: mongoose.Schema.Types.Mixed, required: true },
+    weights: { type: mongoose.Schema.Types.Mixed },
+    // Python optimizer session holding the current round (see PATCH /sessions).
+    optimizerSessionId: String,
     results: [ManufacturerResultSchema],
     rounds: { type: Number, default: 1 },
   },
@@ -1,5 +1,5 @@
 import express from "express";
-import { startNegotiation, optimize } from "../controller/negotiationController.js";
+import { startNegotiation, updateNegotiation, optimize } from "../controller/negotiationController.js";
 import { auth, verifyUser } from "../Middleware/authMiddleware.js";
 
 const router = express.Router();
@@ -11,6 +11,13 @@ const router = express.Router();
  */
 router.post("/start", auth, verifyUser, startNegotiation);
 
+/**
+ * @route   PATCH /api/negotiation/:id
+ * @desc    Next round: send only what changed, re-optimize only what it affects
+ * @access  Private (user only)
+ */
+router.patch("/:id", auth, verifyUser, updateNegotiation);
+
 /**
  * @route   POST /api/negotiation
  * @desc    Proxy negotiation optimization to the Python service
@@ -1,8 +1,11 @@
 import random
-import json
-import os
 from datetime import datetime
-from common_fitness import negotiation_fitness, quality_value_to_label
+from budget import Budget
+from common_fitness import negotiation_fitness_batch, quality_value_to_label
+from convergence import ConvergenceCriteria, ConvergenceMonitor, diversity
+from fitness_cache import FitnessCache
+from result_log import RESULT_LOG
+from warm_start import elite_slots, engine_offer
 
 class Bee:
     def __init__(self, offer, fitness):
@@ -11,7 +14,8 @@ class Bee:
         self.trial = 0
 
 class ABCNegotiation:
-    def __init__(self, num_bees, limit, max_iter, bounds, user, manufacturer, weights):
+    def __init__(self, num_bees, limit, max_iter, bounds, user, manufacturer, weights, convergence=None,
+                 deadline_ms=None, max_evaluations=None, seed=None, warm_start=None):
         self.num_bees = num_bees
         self.limit = limit
         self.max_iter = max_iter
@@ -20,34 +24,51 @@ class ABCNegotiation:
         self.manufacturer = manufacturer
         self.weights = weights
         self.bees = []
+        self.convergence = ConvergenceCriteria.coerce(convergence)
+        self.budget = Budget(deadline_ms, max_evaluations)
+        self.rng = random.Random(seed)  # own generator, so a seed makes the run reproducible
+        # Offers from an earlier round to start from (see warm_start.engine_warm_start).
+        self.elites = warm_start["elites"] if warm_start else []
+        self.target_fitness = warm_start["target_fitness"] if warm_start else None
+        self.fitness_cache = FitnessCache(self.score_batch)
 
     def evaluate_fitness(self, offer):
-        mapped_offer = {
-            'price': offer[0],
-            'delivery': offer[1],
-            'quality': offer[2] / 100.0  # normalize to 0.3–1.0 range if needed
-        }
-        return negotiation_fitness(mapped_offer, self.user, self.manufacturer, self.weights, verbose=True, algo_name="abc_mng")
+        return self.evaluate_fitness_batch([offer])[0]
+
+    def evaluate_fitness_batch(self, offers):
+        """Fitness of a list of offers, re-using cached scores for repeated candidates."""
+        return self.fitness_cache.evaluate(offers)
+
+    def score_batch(self, offers):
+        """Score a list of [price, delivery, quality %] offers in one call."""
+        self.budget.charge(len(offers))
+        fitness, _, _ = negotiation_fitness_batch(
+            [o[0] for o in offers],
+            [o[1] for o in offers],
+            [o[2] / 100.0 for o in offers],  # normalize to 0.3–1.0 range if needed
+            self.user, self.manufacturer, self.weights, verbose=True, algo_name="abc_mng"
+        )
+        return fitness.tolist()
 
     def random_offer(self):
         return [
-            round(random.uniform(*self.bounds[0]), 2),  # price
-            random.randint(*self.bounds[1]),            # delivery
-            random.randint(*self.bounds[2])             # quality (as percentage)
+            round(self.rng.uniform(*self.bounds[0]), 2),  # price
+            self.rng.randint(*self.bounds[1]),            # delivery
+            self.rng.randint(*self.bounds[2])             # quality (as percentage)
         ]
 
     def initialize_population(self):
-        self.bees = []
-        for _ in range(self.num_bees):
-            offer = self.random_offer()
-            fit = self.evaluate_fitness(offer)
-            self.bees.append(Bee(offer, fit))
+        offers = [self.random_offer() for _ in range(self.num_bees)]
+        # Warm start: the first bees begin at the previous round's elites.
+        for i, elite in enumerate(self.elites[:elite_slots(self.num_bees, self.elites)]):
+            offers[i] = engine_offer(elite, self.bounds)
+        self.bees = [Bee(offer, fit) for offer, fit in zip(offers, self.evaluate_fitness_batch(offers))]
 
     def multi_neighbor_mutation(self, offer):
-        neighbors = random.sample(self.bees, k=min(3, len(self.bees)))
+        neighbors = self.rng.sample(self.bees, k=min(3, len(self.bees)))
         mutated = offer[:]
         for i in range(len(offer)):
-            phi = random.uniform(-1, 1)
+            phi = self.rng.uniform(-1, 1)
             neighbor_vals = [b.offer[i] for b in neighbors]
             neighbor_mean = sum(neighbor_vals) / len(neighbor_vals)
             mutated[i] = offer[i] + phi * (neighbor_mean - offer[i])
@@ -56,10 +77,9 @@ class ABCNegotiation:
             mutated[i] = round(max(min(mutated[i], max_val), min_val), 2 if i == 0 else 0)
         return mutated
 
-    def employed_bee_phase(self):
-        for i in range(self.num_bees):
-            candidate = self.multi_neighbor_mutation(self.bees[i].offer)
-            candidate_fitness = self.evaluate_fitness(candidate)
+    def greedy_update(self, indices, candidates):
+        """Score all candidates in one batch, then keep each one that improves its bee."""
+        for i, candidate, candidate_fitness in zip(indices, candidates, self.evaluate_fitness_batch(candidates)):
             if candidate_fitness > self.bees[i].fitness:
                 self.bees[i].offer = candidate
                 self.bees[i].fitness = candidate_fitness
@@ -67,31 +87,34 @@ class ABCNegotiation:
             else:
                 self.bees[i].trial += 1
 
+    def employed_bee_phase(self):
+        indices = list(range(self.num_bees))
+        candidates = [self.multi_neighbor_mutation(self.bees[i].offer) for i in indices]
+        self.greedy_update(indices, candidates)
+
     def onlooker_bee_phase(self):
         # Higher fitness = better offer, so probability is proportional
         # (not inversely proportional) to fitness.
         total_fitness = sum(bee.fitness + 1e-6 for bee in self.bees)
         probs = [(bee.fitness + 1e-6) / total_fitness for bee in self.bees]
 
-        for _ in range(self.num_bees):
-            i = self.roulette_wheel_selection(probs)
-            candidate = self.multi_neighbor_mutation(self.bees[i].offer)
-            candidate_fitness = self.evaluate_fitness(candidate)
-            if candidate_fitness > self.bees[i].fitness:
-                self.bees[i].offer = candidate
-                self.bees[i].fitness = candidate_fitness
-                self.bees[i].trial = 0
-            else:
-                self.bees[i].trial += 1
+        indices = [self.roulette_wheel_selection(probs) for _ in range(self.num_bees)]
+        candidates = [self.multi_neighbor_mutation(self.bees[i].offer) for i in indices]
+        self.greedy_update(indices, candidates)
 
     def scout_bee_phase(self):
-        for i in range(self.num_bees):
-            if self.bees[i].trial >= self.limit:
-                new_offer = self.random_offer()
-                self.bees[i] = Bee(new_offer, self.evaluate_fitness(new_offer))
+        exhausted = [i for i in range(self.num_bees) if self.bees[i].trial >= self.limit]
+        remaining = self.budget.remaining()
+        if remaining is not None:
+            exhausted = exhausted[:remaining]  # the rest scout next iteration, budget permitting
+        if not exhausted:
+            return
+        new_offers = [self.random_offer() for _ in exhausted]
+        for i, new_offer, fit in zip(exhausted, new_offers, self.evaluate_fitness_batch(new_offers)):
+            self.bees[i] = Bee(new_offer, fit)
 
     def roulette_wheel_selection(self, probs):
-        r = random.random()
+        r = self.rng.random()
         cumulative = 0.0
         for i, p in enumerate(probs):
             cumulative += p
@@ -100,16 +123,27 @@ class ABCNegotiation:
         return len(probs) - 1
 
     def run(self):
+        self.budget.restart()
+        self.fitness_cache = FitnessCache(self.score_batch)
         self.initialize_population()
         best_solution = max(self.bees, key=lambda b: b.fitness)
+        monitor = ConvergenceMonitor(self.convergence, self.max_iter, target=self.target_fitness)
+        monitor.start(best_solution.fitness)
+        lower, upper = zip(*self.bounds)
 
         for _ in range(self.max_iter):
+            # Employed + onlooker phases score at most 2 * num_bees candidates.
+            if not self.budget.allows(2 * self.num_bees):
+                monitor.stop_reason = self.budget.exhausted_by
+                break
             self.employed_bee_phase()
             self.onlooker_bee_phase()
             self.scout_bee_phase()
             current_best = max(self.bees, key=lambda b: b.fitness)
             if current_best.fitness > best_solution.fitness:
                 best_solution = current_best
+            if monitor.update(best_solution.fitness, diversity([b.offer for b in self.bees], lower, upper)):
+                break
 
         result = {
             "manufacturerID": self.manufacturer["id"],
@@ -122,16 +156,19 @@ class ABCNegotiation:
             "metadata": {
                 "num_bees": self.num_bees,
                 "max_iter": self.max_iter,
+                **monitor.report(),
+                "evaluations": self.fitness_cache.misses,
+                "budget": self.budget.report(),
+                "fitness_cache": self.fitness_cache.stats(),
             },
         }
+        if self.elites:
+            result["metadata"]["elites_seeded"] = elite_slots(self.num_bees, self.elites)
 
-        os.makedirs("results", exist_ok=True)
-        with open("results/abc_mng_results.json", "a") as f:
-            json.dump({
-                "timestamp": datetime.utcnow().isoformat(),
-                "result": result
-            }, f)
-            f.write("\n")
+        RESULT_LOG.summary("abc_mng_results.json", {
+            "timestamp": datetime.utcnow().isoformat(),
+            "result": result
+        })
 
         return result
 
@@ -1,53 +1,201 @@
 import time
+import warm_start
 from abc_engine import ABCNegotiation
+from convergence import ConvergenceCriteria
+from engine_log import track_suppressed
 from genetic_engine import GA_Negotiation
-from pso_engine import run_mpso_one_manufacturer
+from islands import run_mpso_islands
+from pso_engine import MAX_PARTICLES, run_mpso, run_mpso_one_manufacturer
+from result_log import flushed
 
 
-def run_all_algorithms(user, manufacturer, weights):
+# Stop an engine once its best offer has not improved by more than 1e-5 for
+# 10 iterations, or once its population has collapsed onto a single point.
+DEFAULT_CONVERGENCE = {"patience": 10, "min_delta": 1e-5, "min_diversity": 1e-4}
+
+# Fixed per-engine settings. Part of the result-cache key, so changing any of
+# them (or engine behaviour, via ENGINE_VERSION) invalidates cached results.
+ENGINE_CONFIG = {
+    "MPSO": {"max_iters": 30},
+    "ABC-MNG": {"num_bees": 15, "limit": 8, "max_iter": 50},
+    "GA-HV": {"population_size": 25, "generations": 60, "mutation_rate": 0.2},
+}
+ENGINE_VERSION = 3
+
+
+def initial_evaluations(islands=1):
+    """
+    The most fitness evaluations any engine spends scoring its initial
+    population, which it always does; a smaller ``max_evaluations`` could
+    not be honoured.
+    """
+    return max(ENGINE_CONFIG["ABC-MNG"]["num_bees"], ENGINE_CONFIG["GA-HV"]["population_size"],
+               MAX_PARTICLES * islands)
+
+
+def engine_bounds(manufacturer):
     # Unified bounds: price, delivery, quality (as normalized float or percentage)
-    bounds = [
+    return [
         (manufacturer['minPrice'], manufacturer['initialOffer']['price']),
         (manufacturer['minDelivery'], manufacturer['initialOffer']['delivery']),
         (80, 100)  # Quality in percentage for GA/ABC (will be normalized internally)
     ]
 
-    results = {}
 
+def _limits(options):
+    """Early-stopping, budget and seed keyword arguments shared by every engine."""
+    return {
+        "convergence": ConvergenceCriteria.coerce(options.get("convergence", DEFAULT_CONVERGENCE)),
+        "deadline_ms": options.get("deadline_ms"),
+        "max_evaluations": options.get("max_evaluations"),
+        "seed": options.get("seed"),
+    }
+
+
+def _warm_start(options, manufacturer, engine):
+    """This engine's warm start for ``manufacturer`` from ``options["warm_start"]``, or None."""
+    elites = (options.get("warm_start") or {}).get(manufacturer["id"])
+    return warm_start.engine_warm_start(elites, engine)
+
+
+def _run_mpso(user, manufacturer, weights, options):
     # --- Run MPSO (PSO + contribution-based multi-agent)
-    start = time.time()
-    pso_result = run_mpso_one_manufacturer(user, manufacturer, weights, max_iters=30)
-    pso_result.setdefault('metadata', {})['execution_time'] = round(time.time() - start, 4)
-    results['MPSO'] = pso_result
+    warm = _warm_start(options, manufacturer, "MPSO")
+    if options.get("islands"):
+        return run_mpso_islands(user, manufacturer, weights, **options["islands"], warm_start=warm,
+                                **ENGINE_CONFIG["MPSO"], **_limits(options))
+    return run_mpso_one_manufacturer(user, manufacturer, weights, trace=options.get("trace"),
+                                     warm_start={manufacturer["id"]: warm} if warm else None,
+                                     **ENGINE_CONFIG["MPSO"], **_limits(options))
+
+
+def run_mpso_catalog(user, manufacturers, weights, options=None):
+    """
+    MPSO alone over a whole catalog, every manufacturer's swarm stacked into
+    one array and advanced together; results sorted by fitness. With
+    ``options["islands"]`` each manufacturer gets an island run instead.
+    """
+    options = options or {}
+    warm = {m["id"]: _warm_start(options, m, "MPSO") for m in manufacturers}
+    warm = {mid: w for mid, w in warm.items() if w}
+    if options.get("islands"):
+        results = sorted((_run_mpso(user, m, weights, options) for m in manufacturers),
+                         key=lambda r: r["fitness"], reverse=True)
+    else:
+        results = run_mpso(user, manufacturers, weights, trace=options.get("trace"), batched=True,
+                           warm_start=warm or None, **ENGINE_CONFIG["MPSO"], **_limits(options))
+    for result in results:
+        if result["manufacturerID"] in warm:
+            result["metadata"]["warm_start"] = warm_start.report(warm[result["manufacturerID"]], result["metadata"])
+    return results
 
+
+def _run_abc(user, manufacturer, weights, options):
     # --- Run ABC-MNG
-    start = time.time()
     abc = ABCNegotiation(
-        num_bees=15,
-        limit=8,
-        max_iter=50,
-        bounds=bounds,
+        **ENGINE_CONFIG["ABC-MNG"],
+        bounds=engine_bounds(manufacturer),
+        warm_start=_warm_start(options, manufacturer, "ABC-MNG"),
         user=user,
         manufacturer=manufacturer,
-        weights=weights
+        weights=weights,
+        **_limits(options)
     )
-    abc_result = abc.run()
-    abc_result.setdefault('metadata', {})['execution_time'] = round(time.time() - start, 4)
-    results['ABC-MNG'] = abc_result
+    return abc.run()
+
 
+def _run_ga(user, manufacturer, weights, options):
     # --- Run GA-Mixed (NSGA-II inspired with HV selection)
-    start = time.time()
     ga = GA_Negotiation(
-        population_size=25,
-        generations=60,
-        mutation_rate=0.2,
-        bounds=bounds,
+        **ENGINE_CONFIG["GA-HV"],
+        bounds=engine_bounds(manufacturer),
+        warm_start=_warm_start(options, manufacturer, "GA-HV"),
         user=user,
         manufacturer=manufacturer,
-        weights=weights
+        weights=weights,
+        **_limits(options)
     )
-    ga_result = ga.run()
-    ga_result.setdefault('metadata', {})['execution_time'] = round(time.time() - start, 4)
-    results['GA-HV'] = ga_result
+    return ga.run()
 
-    return results
+
+ENGINES = {
+    'MPSO': _run_mpso,
+    'ABC-MNG': _run_abc,
+    'GA-HV': _run_ga,
+}
+
+
+def run_engine(name, user, manufacturer, weights, options=None):
+    """
+    Run one engine and time only its own compute.
+
+    The clock starts inside the process that runs the engine, so time spent
+    queued in an executor is never counted. ``cpu_time`` is reported next to
+    ``execution_time`` so runs that shared cores can still be compared fairly.
+
+    ``options`` holds per-request engine settings: ``convergence`` (a dict of
+    ConvergenceCriteria arguments, or None to disable early stopping),
+    ``deadline_ms``, ``max_evaluations``, ``seed``, the MPSO ``trace`` level
+    and ``warm_start`` (``{manufacturer_id: [elite, ...]}`` from earlier
+    rounds; the run then reports ``metadata.warm_start``). ``islands`` (a
+    dict of run_mpso_islands arguments) runs MPSO in island mode.
+    """
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    with track_suppressed() as suppressed:
+        result = ENGINES[name](user, manufacturer, weights, options or {})
+    metadata = result.setdefault('metadata', {})
+    metadata['execution_time'] = round(time.perf_counter() - start, 4)
+    metadata['cpu_time'] = round(time.process_time() - cpu_start, 4)
+    metadata['log_suppressed'] = suppressed.count
+    warm = _warm_start(options or {}, manufacturer, name)
+    if warm:
+        metadata['warm_start'] = warm_start.report(warm, metadata)
+    return result
+
+
+def run_all_algorithms(user, manufacturer, weights, executor=None, options=None):
+    """
+    Run MPSO, ABC-MNG and GA-HV for one manufacturer.
+
+    By default the engines run one after another. Pass a
+    ``concurrent.futures`` executor (e.g. a ProcessPoolExecutor) to run all
+    three at once, so wall-clock latency is roughly that of the slowest engine.
+    """
+    if executor is None:
+        return {name: run_engine(name, user, manufacturer, weights, options) for name in ENGINES}
+
+    futures = {name: executor.submit(flushed, run_engine, name, user, manufacturer, weights, options) for name in ENGINES}
+    return {name: future.result() for name, future in futures.items()}
+
+
+def build_comparison(manufacturer, algo_results, concurrent=False):
+    """
+    Pick the winning offer and summarize fitness/time per engine.
+
+    Engines that ran ``concurrent``ly shared cores, which inflates their
+    wall-clock times unevenly, so they are compared by ``cpu_time`` instead
+    of ``execution_time``; ``time_metric`` says which one was used.
+    """
+    winner = max(algo_results.keys(), key=lambda k: algo_results[k]['fitness'])
+
+    metric = 'cpu_time' if concurrent else 'execution_time'
+    comparison = {
+        'fitness_comparison': {k: v['fitness'] for k, v in algo_results.items()},
+        'time_comparison': {k: v['metadata'][metric] for k, v in algo_results.items()},
+        'time_metric': metric,
+    }
+
+    return {
+        "manufacturer_id": manufacturer['id'],
+        "algorithms": algo_results,
+        "winner": winner,
+        "winning_offer": algo_results[winner],
+        "comparison_metrics": comparison
+    }
+
+
+def compare_manufacturer(user, manufacturer, weights, executor=None, options=None):
+    """Run every engine for one manufacturer and pick the winning offer."""
+    return build_comparison(manufacturer, run_all_algorithms(user, manufacturer, weights, executor, options),
+                            concurrent=executor is not None)
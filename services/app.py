@@ -1,21 +1,47 @@
-import sys
+# Imported first so the startup report times everything imported after it.
+from warmup import STARTUP, WARMERS
 
-# The algorithm engines print emoji/arrow characters for progress logging.
-# On Windows, uvicorn's stdout/stderr default to the legacy "charmap"
-# encoding, which raises UnicodeEncodeError on those characters and turns
-# into a 400 response. Force UTF-8 so those prints can't crash requests.
-if hasattr(sys.stdout, "reconfigure"):
-    sys.stdout.reconfigure(encoding="utf-8", errors="replace")
-    sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import AnyHttpUrl, BaseModel, Field, ValidationError, model_validator
+from typing import List, Dict, Any, Optional
+from algorithm_runner import initial_evaluations, run_mpso_catalog
+from islands import ISLAND_WORKERS, MAX_ISLANDS
+from coalesce import SingleFlight
+from jobs import JOBS
+from result_cache import RESULT_CACHE, cache_status, canonical_hash
+from sessions import SESSIONS
+from warm_start import ELITES, merge_elites
+from worker_pool import POOL
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any
-from algorithm_runner import run_all_algorithms
-from evaluation_metrics import compute_confusion_metrics
+# evaluation_metrics and pareto_metrics are imported on first use by
+# /full-evaluation, or up front by /ready?warm=metrics.
+STARTUP.mark("app")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    # Spawn and warm the manufacturer worker pool (and any resident island
+    # workers) before serving requests.
+    STARTUP.warm(["pool", "islands"])
+    STARTUP.mark("lifespan")
+    yield
+    JOBS.shutdown()
+    POOL.shutdown()
+    ISLAND_WORKERS.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+# Compress responses for clients that send Accept-Encoding: gzip. NDJSON
+# streams are flushed per record; SSE is never compressed.
+app.add_middleware(GZipMiddleware, minimum_size=int(os.environ.get("DEALHIVE_GZIP_MIN_SIZE", 1024)))
 
 # --- Input Models ---
 class ManufacturerData(BaseModel):
@@ -34,10 +60,156 @@ class UserData(BaseModel):
     qualityPreference: str
     deliveryTimeline: int
 
+class ConvergenceSettings(BaseModel):
+    # Set a field to null to disable that rule.
+    patience: Optional[int] = 10
+    min_delta: float = 1e-5
+    min_diversity: Optional[float] = 1e-4
+
+class PriorElite(BaseModel):
+    # An offer from an earlier round, e.g. a previous winning_offer.
+    price: float
+    delivery: int
+    quality: str
+    fitness: Optional[float] = None
+    # Engine that found it and at which iteration, for metadata.warm_start.iterations_saved.
+    engine: Optional[str] = None
+    best_iteration: Optional[int] = None
+
+def check_island_total(count, n_manufacturers):
+    if count * n_manufacturers > MAX_ISLANDS:
+        raise ValueError(f"islands.count x manufacturers must be at most {MAX_ISLANDS}, "
+                         f"got {count} x {n_manufacturers}")
+
+class IslandSettings(BaseModel):
+    # Island-model MPSO: independent swarms, run side by side on the worker
+    # pool, that swap their best particles every migration_interval iterations.
+    count: int = Field(4, ge=1, le=MAX_ISLANDS)
+    migration_interval: int = Field(5, ge=1)
+    migrants: int = Field(1, ge=1)
+    topology: str = Field("ring", pattern="^(ring|fully_connected|random)$")
+
 class RequestData(BaseModel):
     user: UserData
     manufacturers: List[ManufacturerData]
     weights: Dict[str, float]
+    # Early-stopping rules for every engine; omitted = service defaults.
+    convergence: Optional[ConvergenceSettings] = None
+    # Anytime limits, applied to each engine run for each manufacturer.
+    deadline_ms: Optional[float] = Field(None, gt=0)
+    max_evaluations: Optional[int] = Field(None, gt=0)
+    # Seeds every engine, so identical requests give identical results.
+    seed: Optional[int] = None
+    # Warm start: engines begin from the last results stored under
+    # warm_start_id and/or the given elites (by manufacturer id) instead of a
+    # purely random population. Unrelated to /sessions ids.
+    warm_start_id: Optional[str] = None
+    prior_elites: Optional[Dict[int, List[PriorElite]]] = None
+    islands: Optional[IslandSettings] = None
+
+    @model_validator(mode="after")
+    def check_budget(self):
+        # Every engine scores its whole initial population before checking the budget.
+        if self.max_evaluations is not None:
+            needed = initial_evaluations(self.islands.count if self.islands else 1)
+            if self.max_evaluations < needed:
+                raise ValueError(f"max_evaluations must be at least {needed}, the largest initial population")
+        return self
+
+    @model_validator(mode="after")
+    def check_islands(self):
+        if self.islands is not None:
+            check_island_total(self.islands.count, len(self.manufacturers))
+        return self
+
+    def engine_options(self):
+        options = {"deadline_ms": self.deadline_ms, "max_evaluations": self.max_evaluations, "seed": self.seed}
+        if self.convergence is not None:
+            options["convergence"] = self.convergence.model_dump()
+        if self.islands is not None:
+            islands = self.islands.model_dump()
+            options["islands"] = {"islands": islands.pop("count"), **islands}
+        prior = {mid: [e.model_dump() for e in elites] for mid, elites in (self.prior_elites or {}).items()}
+        remembered = ELITES.get(self.warm_start_id) if self.warm_start_id else {}
+        manufacturer_ids = {m.id for m in self.manufacturers}
+        elites = {mid: e for mid, e in merge_elites(prior, remembered).items() if mid in manufacturer_ids and e}
+        if elites:
+            options["warm_start"] = elites
+        return options
+
+class CompareJobRequest(RequestData):
+    # http(s) only: the finished job is POSTed here with urllib.
+    callback_url: Optional[AnyHttpUrl] = None
+
+class SessionPatch(BaseModel):
+    # Only what changed since the last round. ``user``, ``weights`` and each
+    # manufacturer entry hold changed fields only (manufacturers by "id"; an unknown id
+    # adds a manufacturer and must then be complete).
+    user: Optional[Dict[str, Any]] = None
+    weights: Optional[Dict[str, float]] = None
+    manufacturers: List[Dict[str, Any]] = []
+    remove: List[int] = []
+
+class ResponseShape:
+    """
+    ``include`` / ``history`` query parameters for the comparison endpoints.
+
+    ``include`` lists the fields kept in every algorithm result (and
+    ``winning_offer``): ``offer``, ``fitness``, ``timing`` (execution and CPU
+    time) and ``metadata`` (everything). Omitted, results are returned whole.
+    ``history`` sets the MPSO trace level, so an unwanted ``roundHistory`` is
+    never computed in the first place. The "full" level writes trace files on
+    the server, so it is only available to operators (DEALHIVE_MPSO_TRACE).
+    """
+
+    FIELDS = ("offer", "fitness", "timing", "metadata")
+    TIMING = ("execution_time", "cpu_time")
+
+    def __init__(
+        self,
+        include: Optional[str] = Query(None, description="Comma-separated: offer,fitness,timing,metadata"),
+        history: Optional[str] = Query(None, pattern="^(none|curve|summary)$"),
+    ):
+        self.include = None
+        if include is not None:
+            self.include = {field.strip() for field in include.split(",") if field.strip()}
+            unknown = self.include.difference(self.FIELDS)
+            if unknown:
+                raise HTTPException(status_code=422, detail=f"Unknown include fields: {', '.join(sorted(unknown))}")
+        self.history = history
+
+    def engine_options(self, request_data):
+        return self.with_history(request_data.engine_options())
+
+    def with_history(self, options):
+        if self.history is not None:
+            options = dict(options, trace=self.history)
+        return options
+
+    def project(self, algo):
+        if self.include is None:
+            return algo
+        shaped = {"manufacturerID": algo.get("manufacturerID")}
+        if "offer" in self.include:
+            shaped["optimizedOffer"] = algo.get("optimizedOffer")
+        if "fitness" in self.include:
+            shaped["fitness"] = algo.get("fitness")
+        metadata = algo.get("metadata", {})
+        if "metadata" in self.include:
+            shaped["metadata"] = metadata
+        elif "timing" in self.include:
+            shaped["metadata"] = {key: metadata[key] for key in self.TIMING if key in metadata}
+        return shaped
+
+    def apply(self, comparison):
+        if self.include is None:
+            return comparison
+        return {
+            **comparison,
+            "algorithms": {name: self.project(algo) for name, algo in comparison["algorithms"].items()},
+            "winning_offer": self.project(comparison["winning_offer"]),
+        }
+
 
 class AlgorithmComparisonResult(BaseModel):
     manufacturer_id: int
@@ -47,37 +219,329 @@ class AlgorithmComparisonResult(BaseModel):
     comparison_metrics: Dict[str, Any]
 
 
+def use_cache(request: Request):
+    """Requests sent with ``Cache-Control: no-cache`` recompute (and refresh) their results."""
+    return "no-cache" not in request.headers.get("cache-control", "").lower()
+
+
+def optimize(user, manufacturers, weights, options, read_cache=True):
+    """Optimize every manufacturer; returns (results, suppressed engine log lines, X-Cache status)."""
+    all_results = [None] * len(manufacturers)
+    cached = [False] * len(manufacturers)
+    records = RESULT_CACHE.iter_compare(POOL.iter_compare, user, manufacturers, weights, options, read=read_cache)
+    for index, result, hit in records:
+        all_results[index] = result
+        cached[index] = hit
+    # Only lines dropped by this request's own engine runs, not by cached ones.
+    suppressed_lines = sum(
+        algo['metadata'].get('log_suppressed', 0)
+        for res, hit in zip(all_results, cached) if not hit for algo in res['algorithms'].values()
+    )
+    return all_results, suppressed_lines, cache_status(cached)
+
+
+def compare(request_data: RequestData, options, read_cache=True):
+    """optimize() for a request, remembering its results for its warm-start session."""
+    results = optimize(request_data.user.model_dump(), [m.model_dump() for m in request_data.manufacturers],
+                       request_data.weights, options, read_cache)
+    if request_data.warm_start_id:
+        ELITES.update(request_data.warm_start_id, results[0])
+    return results
+
+
+def run_comparison(request_data: RequestData, shape: Optional[ResponseShape] = None, read_cache=True):
+    """compare() with the response shaping applied."""
+    shape = shape or ResponseShape(include=None, history=None)
+    results, suppressed_lines, cache = compare(request_data, shape.engine_options(request_data), read_cache)
+    return [shape.apply(res) for res in results], suppressed_lines, cache
+
+
+# Identical /compare-algorithms requests that arrive while one is running share it.
+IN_FLIGHT = SingleFlight()
+
+
 # --- Routes ---
 @app.post("/compare-algorithms")
-async def compare_algorithms(request_data: RequestData):
+async def compare_algorithms(request_data: RequestData, shape: ResponseShape = Depends(),
+                             read_cache: bool = Depends(use_cache)):
+    try:
+        # The optimization is CPU-bound; keep it off the event loop so /health
+        # and other requests on this worker stay responsive. Requests with the
+        # same inputs attach to one run; each then applies its own shaping.
+        options = shape.engine_options(request_data)
+        key = canonical_hash({
+            "user": request_data.user.model_dump(),
+            "manufacturers": [m.model_dump() for m in request_data.manufacturers],
+            "weights": request_data.weights,
+            "options": options,
+            "read_cache": read_cache,
+            "warm_start_id": request_data.warm_start_id,
+        })
+        (results, suppressed_lines, cache), coalesced = await IN_FLIGHT.run(
+            key, compare, request_data, options, read_cache
+        )
+
+        # Engine internals log nothing by default; tell the caller how many
+        # lines were dropped so nothing disappears silently.
+        return JSONResponse([shape.apply(res) for res in results], headers={
+            "X-Engine-Log-Suppressed": str(suppressed_lines),
+            "X-Cache": cache,
+            "X-Coalesced": "true" if coalesced else "false",
+        })
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def stream_comparison(request_data: RequestData, shape: Optional[ResponseShape] = None, read_cache=True):
+    """
+    Yield one record per manufacturer as it finishes, then a summary record.
+
+    Records are ``{"type": "result", "index": i, "cached": bool, "result": {...}}``
+    where ``index`` is the manufacturer's position in the request (cached
+    results come first), followed by
+    ``{"type": "summary", ...}`` (or ``{"type": "error", ...}`` if a run fails).
+    """
+    shape = shape or ResponseShape(include=None, history=None)
+    user = request_data.user.model_dump()
+    manufacturers = [m.model_dump() for m in request_data.manufacturers]
+    start = time.perf_counter()
+    winners = {}
+    suppressed_lines = 0
+    streamed = 0
+    cached_flags = []
+
+    try:
+        records = RESULT_CACHE.iter_compare(POOL.iter_compare, user, manufacturers, request_data.weights,
+                                            shape.engine_options(request_data), read=read_cache)
+        for index, result, cached in records:
+            winners[result['winner']] = winners.get(result['winner'], 0) + 1
+            if not cached:
+                suppressed_lines += sum(a['metadata'].get('log_suppressed', 0) for a in result['algorithms'].values())
+            streamed += 1
+            cached_flags.append(cached)
+            if request_data.warm_start_id:
+                ELITES.update(request_data.warm_start_id, [result])
+            yield {"type": "result", "index": index, "cached": cached, "result": shape.apply(result)}
+    except Exception as e:
+        yield {"type": "error", "detail": str(e), "completed": streamed}
+        return
+
+    yield {
+        "type": "summary",
+        "manufacturers": streamed,
+        "winners": winners,
+        "elapsed": round(time.perf_counter() - start, 4),
+        "log_suppressed": suppressed_lines,
+        "cache": cache_status(cached_flags),
+    }
+
+
+def _ndjson(records):
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def _sse(records):
+    for record in records:
+        yield f"event: {record['type']}\ndata: {json.dumps(record)}\n\n"
+
+
+@app.post("/compare-algorithms/stream")
+async def compare_algorithms_stream(request_data: RequestData, format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+                                    shape: ResponseShape = Depends(), read_cache: bool = Depends(use_cache)):
+    """Streaming /compare-algorithms: each manufacturer's result is sent as soon as it is ready."""
+    records = stream_comparison(request_data, shape, read_cache)
+    # Sync generators are iterated in Starlette's thread pool, off the event loop.
+    if format == "sse":
+        return StreamingResponse(_sse(records), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(_ndjson(records), media_type="application/x-ndjson")
+
+
+@app.post("/jobs/compare", status_code=202)
+async def submit_compare_job(request_data: CompareJobRequest, shape: ResponseShape = Depends(),
+                             read_cache: bool = Depends(use_cache)):
+    """Start a comparison in the background and return its job id immediately."""
+    job = JOBS.submit(
+        "compare",
+        lambda: run_comparison(request_data, shape, read_cache)[0],
+        callback_url=str(request_data.callback_url) if request_data.callback_url else None,
+    )
+    return JSONResponse(
+        {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"},
+        status_code=202,
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return JSONResponse(job.to_dict())
+
+
+@app.post("/optimize")
+async def optimize_catalog(request_data: RequestData, shape: ResponseShape = Depends()):
+    """
+    MPSO alone over the whole catalog, every manufacturer's swarm advanced
+    together in one stacked array: the cheapest way to rank a large catalog.
+    """
     try:
-        user = request_data.user.dict()
-        manufacturers = [m.dict() for m in request_data.manufacturers]
-        weights = request_data.weights
+        results = await run_in_threadpool(
+            run_mpso_catalog, request_data.user.model_dump(), [m.model_dump() for m in request_data.manufacturers],
+            request_data.weights, shape.engine_options(request_data)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    results = [shape.project(r) for r in results]
+    return JSONResponse({
+        "recommended": results[0] if results else None,
+        "rejected": results[1:],
+        "allResults": results
+    })
+
+
+def _merge(current, changes):
+    """``current`` with ``changes`` applied; nested dicts (e.g. ``initialOffer``) are merged too."""
+    merged = dict(current or {})
+    for key, value in changes.items():
+        merged[key] = {**merged[key], **value} if isinstance(value, dict) and isinstance(merged.get(key), dict) else value
+    return merged
+
+
+def _validate(model, data, *loc):
+    """``model(**data).model_dump()``, reporting errors like FastAPI does for the request body."""
+    try:
+        return model(**data).model_dump()
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, "loc": ("body", *loc, *error["loc"])} for error in e.errors(include_url=False)
+        ])
+
 
-        all_results = []
+def _session(session_id):
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session {session_id}")
+    return session
 
-        for manufacturer in manufacturers:
-            algo_results = run_all_algorithms(user, manufacturer, weights)
-            winner = max(algo_results.keys(), key=lambda k: algo_results[k]['fitness'])
 
-            comparison = {
-                'fitness_comparison': {k: v['fitness'] for k, v in algo_results.items()},
-                'time_comparison': {k: v['metadata']['execution_time'] for k, v in algo_results.items()}
-            }
+def run_session_round(session, manufacturer_ids, shape, read_cache=True):
+    """Re-optimize ``manufacturer_ids`` (warm-started from their last results) and record the round."""
+    options = shape.with_history(session.options)
+    warm = session.warm_start(manufacturer_ids)
+    if warm:
+        options = dict(options, warm_start=warm)
+    manufacturers = [session.manufacturers[mid] for mid in manufacturer_ids]
+    results, suppressed_lines, cache = optimize(session.user, manufacturers, session.weights, options, read_cache)
+    session.record(results)
+    return results, suppressed_lines, cache
 
-            all_results.append({
-                "manufacturer_id": manufacturer['id'],
-                "algorithms": algo_results,
-                "winner": winner,
-                "winning_offer": algo_results[winner],
-                "comparison_metrics": comparison
-            })
 
-        return JSONResponse(all_results)
+def _round_response(session, results, suppressed_lines, cache, shape, removed=()):
+    return JSONResponse({
+        "session_id": session.id,
+        "round": session.round,
+        "reoptimized": [res["manufacturer_id"] for res in results],
+        "removed": list(removed),
+        "results": [shape.apply(res) for res in results],
+    }, headers={"X-Engine-Log-Suppressed": str(suppressed_lines), "X-Cache": cache})
 
+
+@app.post("/sessions", status_code=201)
+async def create_session(request_data: RequestData, shape: ResponseShape = Depends(),
+                         read_cache: bool = Depends(use_cache)):
+    """
+    Start a negotiation session holding this round's inputs and results, and
+    optimize every manufacturer once. Later rounds PATCH only what changed.
+    """
+    options = request_data.engine_options()
+    session = SESSIONS.create(
+        request_data.user.model_dump(), [m.model_dump() for m in request_data.manufacturers], request_data.weights,
+        {key: value for key, value in options.items() if key != "warm_start"},
+    )
+    # prior_elites (or a warm_start_id) seed the first round.
+    round_options = shape.with_history(options)
+
+    def first_round():
+        with session.lock:
+            results = optimize(session.user, list(session.manufacturers.values()), session.weights,
+                               round_options, read_cache)
+            session.record(results[0])
+            return results
+
+    try:
+        results, suppressed_lines, cache = await run_in_threadpool(first_round)
     except Exception as e:
+        SESSIONS.delete(session.id)
         raise HTTPException(status_code=400, detail=str(e))
+    response = _round_response(session, results, suppressed_lines, cache, shape)
+    response.status_code = 201
+    response.headers["Location"] = f"/sessions/{session.id}"
+    return response
+
+
+@app.patch("/sessions/{session_id}")
+async def update_session(session_id: str, changes: SessionPatch, shape: ResponseShape = Depends(),
+                         read_cache: bool = Depends(use_cache)):
+    """
+    Apply a round's changes and re-optimize only the affected manufacturers:
+    those added or changed, or all of them if the user or weights changed.
+    The response carries only the re-optimized results.
+    """
+    session = _session(session_id)
+    unknown = [mid for mid in changes.remove if mid not in session.manufacturers]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown manufacturer ids: {unknown}")
+    # Only the changed records are re-validated, merged over their current values.
+    user = _validate(UserData, _merge(session.user, changes.user), "user") if changes.user is not None else None
+    weights = _merge(session.weights, changes.weights) if changes.weights is not None else None
+    manufacturers = [
+        _validate(ManufacturerData, _merge(session.manufacturers.get(entry.get("id")), entry), "manufacturers", i)
+        for i, entry in enumerate(changes.manufacturers)
+    ]
+    islands = session.options.get("islands")
+    if islands:
+        ids = (set(session.manufacturers) - set(changes.remove)) | {m["id"] for m in manufacturers}
+        try:
+            check_island_total(islands["islands"], len(ids))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    def run_round():
+        with session.lock:
+            # Staged, so a round that fails leaves the session as it was.
+            staged = session.stage()
+            affected, removed = staged.update(user, weights, manufacturers, changes.remove)
+            if affected:
+                round_result = run_session_round(staged, affected, shape, read_cache)
+            else:
+                round_result = [], 0, cache_status([])
+                staged.updated_at = time.time()
+            session.commit(staged)
+            return (*round_result, removed)
+
+    try:
+        results, suppressed_lines, cache, removed = await run_in_threadpool(run_round)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _round_response(session, results, suppressed_lines, cache, shape, removed)
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str, shape: ResponseShape = Depends()):
+    """The session's current inputs and latest result per manufacturer."""
+    session = _session(session_id)
+    results = [shape.apply(session.results[mid]) for mid in session.manufacturers if mid in session.results]
+    return JSONResponse({**session.to_dict(), "results": results})
+
+
+@app.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str):
+    if not SESSIONS.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session {session_id}")
 
 
 @app.get("/health")
@@ -85,48 +549,60 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/cache/stats")
+async def result_cache_stats():
+    return {**RESULT_CACHE.stats(), "coalescing": IN_FLIGHT.stats()}
+
+
+@app.get("/ready")
+async def ready(warm: Optional[str] = Query(None, description="Comma-separated: engines,pool,islands,metrics or all")):
+    """
+    Readiness probe. ``warm`` runs the listed warm-up steps (each only once
+    per worker) before answering, so the first real request does not pay
+    for them; the response reports import and warm-up timings.
+    """
+    targets = []
+    if warm:
+        targets = list(WARMERS) if warm == "all" else [t.strip() for t in warm.split(",") if t.strip()]
+        unknown = [t for t in targets if t not in WARMERS]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown warm-up targets: {', '.join(unknown)}")
+    await run_in_threadpool(STARTUP.warm, targets)
+    return {"status": "ready", "pool_running": POOL.running, "island_workers_running": ISLAND_WORKERS.running,
+            **STARTUP.report()}
+
+
 @app.post("/full-evaluation")
 async def full_evaluation(algorithm_results: List[AlgorithmComparisonResult]):
     try:
-        # Imported lazily because pygmo (used for hypervolume metrics) is
-        # difficult to install via pip on Windows. /compare-algorithms and
-        # /health do not depend on it.
-        try:
-            from pareto_metrics import calculate_pareto_metrics
-        except ImportError as imp_err:
-            raise HTTPException(
-                status_code=503,
-                detail=(
-                    "Pareto metrics unavailable: 'pygmo' is not installed. "
-                    f"Install it (e.g. via conda) to use /full-evaluation. ({imp_err})"
-                ),
-            )
+        compute_confusion_metrics = STARTUP.load("evaluation_metrics").compute_confusion_metrics
+        calculate_pareto_metrics_batch = STARTUP.load("pareto_metrics").calculate_pareto_metrics_batch
 
         true_winners = [res.winner for res in algorithm_results]
         predicted_winners = true_winners  # Placeholder
 
         class_metrics = compute_confusion_metrics(true_winners, predicted_winners)
 
-        # Build Pareto input
-        pareto_data = {}
-        for res in algorithm_results:
-            pareto_data[res.manufacturer_id] = {
-                'MPSO': [res.algorithms['MPSO']['fitness'], res.algorithms['MPSO']['execution_time']],
-                'ABC-MNG': [res.algorithms['ABC-MNG']['fitness'], res.algorithms['ABC-MNG']['execution_time']],
-                'GA-HV': [res.algorithms['GA-HV']['fitness'], res.algorithms['GA-HV']['execution_time']]
-            }
+        # One (fitness, execution time) point per algorithm per manufacturer.
+        groups = [
+            {name: [[algo['fitness'], algo['metadata']['execution_time']]] for name, algo in res.algorithms.items()}
+            for res in algorithm_results
+        ]
 
         # Calculate reference point based on worst-case (max time, max fitness buffer)
-        all_times = [algo['metadata']['execution_time'] for res in algorithm_results for algo in res.algorithms.values()]
+        all_times = [point[1] for group in groups for points in group.values() for point in points]
         reference_point = [1.0, max(all_times) * 1.1]
 
-        pareto_metrics = {}
-        for mid, algo_points in pareto_data.items():
-            pareto_metrics[mid] = calculate_pareto_metrics({k: [v] for k, v in algo_points.items()}, reference_point)
+        # Every manufacturer's fronts and indicators in one vectorized pass.
+        pareto = await run_in_threadpool(calculate_pareto_metrics_batch, groups, reference_point)
+        pareto_metrics = {
+            res.manufacturer_id: metrics for res, metrics in zip(algorithm_results, pareto["groups"])
+        }
 
         return JSONResponse({
             "classification_metrics": class_metrics,
-            "pareto_metrics": pareto_metrics
+            "pareto_metrics": pareto_metrics,
+            "aggregate_metrics": pareto["aggregate"]
         })
 
     except Exception as e:
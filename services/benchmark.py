@@ -0,0 +1,219 @@
+# services/benchmark.py
+"""
+Engine micro-benchmarks on seeded synthetic workloads.
+
+    python benchmark.py --sizes 1,10,100,1000 --output bench.json
+
+For every catalog size and target (each engine, batched MPSO, island-model
+MPSO on request, plus the full run_all_algorithms path) this reports wall/CPU time, fitness evaluations and
+evaluations per second, peak traced memory and final fitness. The JSON output
+records the git commit, so runs can be diffed across commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# Measure the engines, not result-log disk I/O (override by exporting it).
+os.environ.setdefault("DEALHIVE_RESULT_LOG", "off")
+
+import numpy as np
+
+from algorithm_runner import ENGINES, run_all_algorithms, run_engine, run_mpso_catalog
+
+QUALITY_TIERS = ["Economy", "Standard", "Premium"]
+ALL_ENGINES = "run_all_algorithms"
+# MPSO with every manufacturer's swarm stacked into one array.
+BATCHED_MPSO = "MPSO-batched"
+# MPSO as four migrating island swarms per manufacturer, in-process, and the
+# same islands on resident island workers (started for it; sized by
+# --island-processes). Not run by default; the resident target's peak memory
+# only covers the coordinating process.
+ISLAND_MPSO = "MPSO-islands"
+RESIDENT_ISLAND_MPSO = "MPSO-islands-resident"
+
+
+def synthetic_workload(n_manufacturers, seed=0):
+    """A reproducible (user, manufacturers, weights) triple with ``n_manufacturers`` offers."""
+    rng = random.Random(seed)
+    user = {
+        "fabricType": "Cotton",
+        "quantity": rng.randint(100, 5000),
+        "priceRange": rng.randint(800, 1500),
+        "qualityPreference": rng.choice(QUALITY_TIERS),
+        "deliveryTimeline": rng.randint(3, 14),
+    }
+    manufacturers = []
+    for i in range(n_manufacturers):
+        min_price = rng.randint(600, 1200)
+        min_delivery = rng.randint(2, 7)
+        first = rng.randrange(len(QUALITY_TIERS))
+        manufacturers.append({
+            "id": i + 1,
+            "initialOffer": {
+                "price": min_price + rng.randint(100, 600),
+                "quality": rng.choice(QUALITY_TIERS[first:]),
+                "delivery": min_delivery + rng.randint(2, 10),
+            },
+            "minPrice": min_price,
+            "minDelivery": min_delivery,
+            "qualities": QUALITY_TIERS[first:],
+            "maxQualityCost": round(rng.uniform(0.5, 1.0), 2),
+            "deliveryCapacity": rng.randint(min_delivery, min_delivery + 8),
+        })
+    user_weight = round(rng.uniform(0.3, 0.7), 2)
+    weights = {"user": user_weight, "manufacturer": round(1 - user_weight, 2)}
+    return user, manufacturers, weights
+
+
+def _run_target(target, user, manufacturers, weights, seed):
+    """Run ``target`` for every manufacturer; return (best fitness, evaluations) per manufacturer."""
+    options = {"seed": seed}
+    if target == BATCHED_MPSO:
+        return [(r["fitness"], r["metadata"]["budget"]["evaluations_used"])
+                for r in run_mpso_catalog(user, manufacturers, weights, options)]
+    if target in (ISLAND_MPSO, RESIDENT_ISLAND_MPSO):
+        options["islands"] = {"islands": 4, "processes": target == RESIDENT_ISLAND_MPSO}
+        target = "MPSO"
+    outcomes = []
+    for manufacturer in manufacturers:
+        if target == ALL_ENGINES:
+            results = run_all_algorithms(user, manufacturer, weights, options=options)
+        else:
+            results = {target: run_engine(target, user, manufacturer, weights, options)}
+        outcomes.append((
+            max(r["fitness"] for r in results.values()),
+            sum(r["metadata"]["budget"]["evaluations_used"] for r in results.values()),
+        ))
+    return outcomes
+
+
+def bench(target, user, manufacturers, weights, memory=True, seed=0):
+    """Time one target over a whole catalog; optionally re-run it under tracemalloc for peak memory."""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    outcomes = _run_target(target, user, manufacturers, weights, seed)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    peak = None
+    if memory:
+        # Separate pass: tracemalloc slows allocation-heavy code down too much
+        # to share a run with the timings.
+        tracemalloc.start()
+        _run_target(target, user, manufacturers, weights, seed)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    fitness = np.array([f for f, _ in outcomes])
+    evaluations = int(sum(e for _, e in outcomes))
+    return {
+        "target": target,
+        "manufacturers": len(manufacturers),
+        "wall_time": round(wall, 4),
+        "cpu_time": round(cpu, 4),
+        "evaluations": evaluations,
+        "evals_per_sec": round(evaluations / wall, 1) if wall > 0 else None,
+        "peak_memory_kb": None if peak is None else round(peak / 1024, 1),
+        "fitness": {
+            "mean": round(float(fitness.mean()), 4),
+            "min": round(float(fitness.min()), 4),
+            "max": round(float(fitness.max()), 4),
+        },
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, targets, seed=0, memory=True, progress=None):
+    results = []
+    for n in sizes:
+        user, manufacturers, weights = synthetic_workload(n, seed)
+        for target in targets:
+            result = bench(target, user, manufacturers, weights, memory, seed)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def _print_row(result):
+    memory = "-" if result["peak_memory_kb"] is None else f"{result['peak_memory_kb']:.0f} KiB"
+    print(
+        f"{result['target']:>20} n={result['manufacturers']:<6} "
+        f"wall={result['wall_time']:.3f}s evals/s={result['evals_per_sec']} "
+        f"peak={memory} fitness={result['fitness']['mean']:.4f}",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the negotiation engines on synthetic catalogs.")
+    parser.add_argument("--sizes", default="1,10,100",
+                        help="comma-separated manufacturer counts (1-10000), default: 1,10,100")
+    parser.add_argument("--targets", default=",".join([*ENGINES, BATCHED_MPSO, ALL_ENGINES]),
+                        help="comma-separated engines to run (default: every engine, %s and %s; "
+                             "%s and %s on request)" % (BATCHED_MPSO, ALL_ENGINES, ISLAND_MPSO,
+                                                        RESIDENT_ISLAND_MPSO))
+    parser.add_argument("--island-processes", type=int,
+                        default=int(os.environ.get("DEALHIVE_MPSO_ISLAND_PROCESSES") or 4),
+                        help="resident island workers for %s (default: 4)" % RESIDENT_ISLAND_MPSO)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if any(not 1 <= n <= 10000 for n in sizes):
+        parser.error("sizes must be between 1 and 10000")
+    targets = args.targets.split(",")
+    extra = (BATCHED_MPSO, ISLAND_MPSO, RESIDENT_ISLAND_MPSO, ALL_ENGINES)
+    unknown = [t for t in targets if t not in ENGINES and t not in extra]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)}")
+
+    workers = None
+    if RESIDENT_ISLAND_MPSO in targets:
+        from islands import ISLAND_WORKERS as workers
+
+        workers.processes = args.island_processes
+        workers.start()
+    try:
+        report = run_suite(sizes, targets, args.seed, memory=not args.no_memory, progress=_print_row)
+    finally:
+        if workers is not None:
+            workers.shutdown()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
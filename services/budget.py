@@ -0,0 +1,55 @@
+# services/budget.py
+
+import time
+
+
+class Budget:
+    """
+    Wall-clock and fitness-evaluation limits for one engine run (anytime mode).
+
+    Engines call ``allows(n)`` before scoring a batch of ``n`` candidates and
+    ``charge(n)`` after it. Once a limit is hit they stop and return their
+    best-so-far; ``exhausted_by`` names the limit ("deadline" or
+    "max_evaluations"). A budget with no limits allows everything.
+    """
+
+    def __init__(self, deadline_ms=None, max_evaluations=None):
+        self.deadline_ms = deadline_ms
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self.exhausted_by = None
+        self.restart()
+
+    def restart(self):
+        """Start the clock (engines call this at the top of run())."""
+        self.evaluations = 0
+        self.exhausted_by = None
+        self._start = time.perf_counter()
+        self._deadline = None if self.deadline_ms is None else self._start + self.deadline_ms / 1000.0
+
+    def remaining(self):
+        """Evaluations left, or None if unlimited."""
+        if self.max_evaluations is None:
+            return None
+        return max(0, self.max_evaluations - self.evaluations)
+
+    def allows(self, n=0):
+        """True if another ``n`` evaluations fit in the budget and the deadline has not passed."""
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            self.exhausted_by = "deadline"
+            return False
+        if self.max_evaluations is not None and self.evaluations + n > self.max_evaluations:
+            self.exhausted_by = "max_evaluations"
+            return False
+        return True
+
+    def charge(self, n):
+        self.evaluations += n
+
+    def report(self):
+        return {
+            "deadline_ms": self.deadline_ms,
+            "max_evaluations": self.max_evaluations,
+            "evaluations_used": self.evaluations,
+            "elapsed_ms": round((time.perf_counter() - self._start) * 1000.0, 3),
+        }
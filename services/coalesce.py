@@ -0,0 +1,36 @@
+# services/coalesce.py
+
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: the first caller for a key (the
+    leader) runs ``fn`` in the thread pool, and callers arriving with the same
+    key while it runs (followers) await the same result instead of starting
+    their own. Scope is one event loop, i.e. one uvicorn worker.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def run(self, key, fn, *args):
+        """Return ``(result, coalesced)``; ``coalesced`` is True for followers."""
+        future = self._inflight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self.followers += 1
+        else:
+            self.leaders += 1
+            future = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded: a caller that disconnects must not cancel the shared run.
+        return await asyncio.shield(future), coalesced
+
+    def stats(self):
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
@@ -1,9 +1,15 @@
 # services/common_fitness.py
 
-import json
-import os
+import logging
 from datetime import datetime
 
+import numpy as np
+
+from engine_log import get_engine_logger
+from result_log import RESULT_LOG
+
+log = get_engine_logger("fitness")
+
 QUALITY_MAP = {'Economy': 0.3, 'Standard': 0.6, 'Premium': 1.0}
 REVERSE_QUALITY_MAP = {v: k for k, v in QUALITY_MAP.items()}
 
@@ -14,11 +20,15 @@ def quality_value_to_label(value):
 
 
 def log_to_json(filename, data):
-    os.makedirs("results", exist_ok=True)
-    filepath = os.path.join("results", filename)
-    with open(filepath, "a") as f:
-        json.dump(data, f)
-        f.write("\n")
+    """Queue one per-evaluation log entry on the buffered result log."""
+    RESULT_LOG.evaluation(filename, data)
+
+
+def quality_values(qualities):
+    """Map quality labels (or already-numeric 0-1 values) to a float array."""
+    if isinstance(qualities, np.ndarray) and qualities.dtype.kind in "fiub":
+        return qualities.astype(float)
+    return np.array([QUALITY_MAP.get(q, 0.6) if isinstance(q, str) else q for q in qualities], dtype=float)
 
 
 def negotiation_fitness(offer, user, manufacturer, weights, verbose=False, algo_name="pso"):
@@ -58,39 +68,173 @@ def negotiation_fitness(offer, user, manufacturer, weights, verbose=False, algo_
         weights['manufacturer'] * manufacturer_satisfaction
     )
 
-    log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "algorithm": algo_name,
-        "offer": offer,
-        "user": user,
-        "manufacturer": manufacturer,
-        "weights": weights,
-        "user_satisfaction": {
-            "price": price_score_user,
-            "quality": quality_score_user,
-            "delivery": delivery_score_user,
-            "total": user_satisfaction
-        },
-        "manufacturer_satisfaction": {
-            "price": price_score_manu,
-            "quality": quality_score_manu,
-            "delivery": delivery_score_manu,
-            "total": manufacturer_satisfaction
-        },
-        "total_fitness": total_fitness
-    }
-
-    log_to_json(f"{algo_name}_results.json", log_entry)
+    if RESULT_LOG.sample():
+        log_to_json(f"{algo_name}_results.json", {
+            "timestamp": datetime.utcnow().isoformat(),
+            "algorithm": algo_name,
+            "offer": offer,
+            "user": user,
+            "manufacturer": manufacturer,
+            "weights": weights,
+            "user_satisfaction": {
+                "price": price_score_user,
+                "quality": quality_score_user,
+                "delivery": delivery_score_user,
+                "total": user_satisfaction
+            },
+            "manufacturer_satisfaction": {
+                "price": price_score_manu,
+                "quality": quality_score_manu,
+                "delivery": delivery_score_manu,
+                "total": manufacturer_satisfaction
+            },
+            "total_fitness": total_fitness
+        })
 
     if verbose:
-        print(f"[User] Price: {price_score_user:.2f}, Quality: {quality_score_user:.2f}, Delivery: {delivery_score_user:.2f} → Satisfaction: {user_satisfaction:.2f}")
-        print(f"[Manufacturer] Price: {price_score_manu:.2f}, Quality: {quality_score_manu:.2f}, Delivery: {delivery_score_manu:.2f} → Satisfaction: {manufacturer_satisfaction:.2f}")
-        print(f"[Fitness] Total: {total_fitness:.4f} with weights {weights}")
-        print("=" * 70)
+        log.debug(
+            "fitness.evaluated", algorithm=algo_name,
+            user_price=price_score_user, user_quality=quality_score_user,
+            user_delivery=delivery_score_user, user_satisfaction=user_satisfaction,
+            manu_price=price_score_manu, manu_quality=quality_score_manu,
+            manu_delivery=delivery_score_manu, manu_satisfaction=manufacturer_satisfaction,
+            fitness=total_fitness
+        )
 
     return total_fitness
 
 
+def _satisfaction(prices, deliveries, qualities, user, min_price, quality_cost_limit, delivery_capacity, weights):
+    """
+    negotiation_fitness's scores as arrays: the manufacturer constraints may
+    be scalars or arrays that broadcast against the offers.
+    """
+    # === USER SATISFACTION ===
+    price_target = user['priceRange']
+    quality_user = QUALITY_MAP.get(user['qualityPreference'], 0.6)
+    delivery_target = user['deliveryTimeline']
+
+    price_score_user = np.maximum(0, 1 - np.abs(prices - price_target) / price_target)
+    quality_score_user = np.maximum(0, 1 - np.abs(qualities - quality_user))
+    delivery_score_user = np.maximum(0, 1 - np.abs(deliveries - delivery_target) / delivery_target)
+    user_scores = (price_score_user, quality_score_user, delivery_score_user)
+    user_satisfaction = sum(user_scores) / 3
+
+    # === MANUFACTURER SATISFACTION ===
+    price_score_manu = np.maximum(0, (prices - min_price) / min_price)
+    quality_score_manu = np.maximum(0, 1 - np.abs(qualities - quality_cost_limit))
+    delivery_score_manu = np.maximum(0, 1 - np.abs(deliveries - delivery_capacity) / delivery_capacity)
+    manu_scores = (price_score_manu, quality_score_manu, delivery_score_manu)
+    manufacturer_satisfaction = sum(manu_scores) / 3
+
+    # === COMBINED FITNESS ===
+    total_fitness = (
+        weights['user'] * user_satisfaction +
+        weights['manufacturer'] * manufacturer_satisfaction
+    )
+    return total_fitness, user_satisfaction, manufacturer_satisfaction, user_scores, manu_scores
+
+
+def _log_evaluations(scores, prices, deliveries, qualities, user, manufacturer_of, weights, verbose, algo_name):
+    """Sampled result-log records and debug lines for a batch of evaluations, indexed in flattened order."""
+    total_fitness, user_satisfaction, manufacturer_satisfaction = (np.ravel(a) for a in scores[:3])
+    price_score_user, quality_score_user, delivery_score_user = (np.ravel(a) for a in scores[3])
+    price_score_manu, quality_score_manu, delivery_score_manu = (np.ravel(a) for a in scores[4])
+    prices, deliveries, qualities = np.ravel(prices), np.ravel(deliveries), np.ravel(qualities)
+
+    logged = RESULT_LOG.sample_indices(total_fitness.size)
+    if logged:
+        timestamp = datetime.utcnow().isoformat()
+        RESULT_LOG.evaluation_batch(f"{algo_name}_results.json", (
+            {
+                "timestamp": timestamp,
+                "algorithm": algo_name,
+                "offer": {"price": float(prices[i]), "delivery": float(deliveries[i]), "quality": float(qualities[i])},
+                "user": user,
+                "manufacturer": manufacturer_of(i),
+                "weights": weights,
+                "user_satisfaction": {
+                    "price": float(price_score_user[i]),
+                    "quality": float(quality_score_user[i]),
+                    "delivery": float(delivery_score_user[i]),
+                    "total": float(user_satisfaction[i])
+                },
+                "manufacturer_satisfaction": {
+                    "price": float(price_score_manu[i]),
+                    "quality": float(quality_score_manu[i]),
+                    "delivery": float(delivery_score_manu[i]),
+                    "total": float(manufacturer_satisfaction[i])
+                },
+                "total_fitness": float(total_fitness[i])
+            }
+            for i in logged
+        ))
+
+    if verbose:
+        if log.enabled(logging.DEBUG):
+            for i in range(total_fitness.size):
+                log.debug(
+                    "fitness.evaluated", algorithm=algo_name,
+                    user_price=float(price_score_user[i]), user_quality=float(quality_score_user[i]),
+                    user_delivery=float(delivery_score_user[i]), user_satisfaction=float(user_satisfaction[i]),
+                    manu_price=float(price_score_manu[i]), manu_quality=float(quality_score_manu[i]),
+                    manu_delivery=float(delivery_score_manu[i]), manu_satisfaction=float(manufacturer_satisfaction[i]),
+                    fitness=float(total_fitness[i])
+                )
+        else:
+            log.suppress(total_fitness.size)
+
+
+def negotiation_fitness_batch(prices, deliveries, qualities, user, manufacturer, weights, verbose=False, algo_name="pso"):
+    """
+    Vectorized negotiation_fitness for N candidates at once.
+
+    Takes equal-length arrays of price, delivery and quality (0-1 values or
+    quality labels) and returns ``(fitness, user_satisfaction,
+    manufacturer_satisfaction)`` as float arrays. Every element matches what
+    negotiation_fitness returns for the same offer.
+    """
+    prices = np.asarray(prices, dtype=float)
+    deliveries = np.asarray(deliveries, dtype=float)
+    qualities = quality_values(qualities)
+
+    scores = _satisfaction(prices, deliveries, qualities, user, manufacturer['minPrice'],
+                           manufacturer['maxQualityCost'], manufacturer['deliveryCapacity'], weights)
+    _log_evaluations(scores, prices, deliveries, qualities, user, lambda i: manufacturer, weights, verbose, algo_name)
+    return scores[:3]
+
+
+def manufacturer_columns(manufacturers):
+    """The fitness-relevant manufacturer constraints as ``(manufacturers, 1)`` columns."""
+    return {
+        key: np.array([m[key] for m in manufacturers], dtype=float)[:, None]
+        for key in ('minPrice', 'maxQualityCost', 'deliveryCapacity')
+    }
+
+
+def negotiation_fitness_stacked(prices, deliveries, qualities, user, manufacturers, weights, verbose=False,
+                                algo_name="pso", constraints=None):
+    """
+    negotiation_fitness_batch for several manufacturers in one call: row
+    ``m`` of the ``(manufacturers, candidates)`` arrays of price, delivery and
+    quality (0-1 values) is scored against ``manufacturers[m]``. Returns
+    ``(fitness, user_satisfaction, manufacturer_satisfaction)`` with the same
+    shape. Callers scoring the same manufacturers repeatedly can pass their
+    ``manufacturer_columns`` as ``constraints``.
+    """
+    prices = np.asarray(prices, dtype=float)
+    deliveries = np.asarray(deliveries, dtype=float)
+    qualities = np.asarray(qualities, dtype=float)
+    columns = constraints if constraints is not None else manufacturer_columns(manufacturers)
+
+    scores = _satisfaction(prices, deliveries, qualities, user, columns['minPrice'],
+                           columns['maxQualityCost'], columns['deliveryCapacity'], weights)
+    width = prices.shape[1]
+    _log_evaluations(scores, prices, deliveries, qualities, user, lambda i: manufacturers[i // width],
+                     weights, verbose, algo_name)
+    return scores[:3]
+
+
 def abc_genetic_fitness(chromosome, user_preferences, verbose=False, algo_name="abc"):
     """
     Weighted-sum fitness for ABC or GA.
@@ -105,33 +249,37 @@ def abc_genetic_fitness(chromosome, user_preferences, verbose=False, algo_name="
     quality_penalty = 1.0 - (quality / 100.0)
     fitness = (w_price * price) + (w_time * delivery) + (w_quality * quality_penalty)
 
-    log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "algorithm": algo_name,
-        "chromosome": {
-            "price": price,
-            "delivery": delivery,
-            "quality": quality
-        },
-        "weights": user_preferences,
-        "components": {
-            "price_score": w_price * price,
-            "delivery_score": w_time * delivery,
-            "quality_penalty_score": w_quality * quality_penalty
-        },
-        "total_fitness": fitness
-    }
-
-    log_to_json(f"{algo_name}_results.json", log_entry)
+    if RESULT_LOG.sample():
+        log_to_json(f"{algo_name}_results.json", {
+            "timestamp": datetime.utcnow().isoformat(),
+            "algorithm": algo_name,
+            "chromosome": {
+                "price": price,
+                "delivery": delivery,
+                "quality": quality
+            },
+            "weights": user_preferences,
+            "components": {
+                "price_score": w_price * price,
+                "delivery_score": w_time * delivery,
+                "quality_penalty_score": w_quality * quality_penalty
+            },
+            "total_fitness": fitness
+        })
 
     if verbose:
-        print(f"[{algo_name.upper()}] Price: {w_price * price:.2f}, Delivery: {w_time * delivery:.2f}, QualityPenalty: {w_quality * quality_penalty:.2f} → Total Fitness: {fitness:.4f}")
-        print("=" * 70)
+        log.debug(
+            "fitness.weighted_sum", algorithm=algo_name,
+            price=w_price * price, delivery=w_time * delivery,
+            quality_penalty=w_quality * quality_penalty, fitness=fitness
+        )
 
     return fitness
 
 
 if __name__ == "__main__":
+    logging.getLogger("dealhive.engine").setLevel(logging.DEBUG)
+
     offer = {'price': 950, 'quality': 'Standard', 'delivery': 7}
     user = {'priceRange': 1000, 'qualityPreference': 'Premium', 'deliveryTimeline': 5}
     manufacturer = {'minPrice': 800, 'maxQualityCost': 0.7, 'deliveryCapacity': 10}
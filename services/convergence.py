@@ -0,0 +1,161 @@
+# services/convergence.py
+
+import numpy as np
+
+
+class ConvergenceCriteria:
+    """
+    Early-stopping rules shared by the MPSO, ABC and GA engines.
+
+    - ``patience``: stop after this many iterations in which the best fitness
+      did not rise by more than ``min_delta`` over the window's starting best.
+      With ``min_delta=0`` this is plain "no improvement over K iterations".
+    - ``min_diversity``: stop once the population's normalized spread (mean
+      per-dimension standard deviation divided by the bound width) falls below
+      this value.
+
+    Any rule left as None is disabled; with all disabled the engine always
+    runs its full budget.
+    """
+
+    def __init__(self, patience=None, min_delta=0.0, min_diversity=None):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.min_diversity = min_diversity
+
+    @classmethod
+    def coerce(cls, value):
+        """Accept None, a ConvergenceCriteria or a dict of its arguments."""
+        if value is None or isinstance(value, cls):
+            return value
+        return cls(**value)
+
+
+class BatchConvergenceMonitor:
+    """
+    Tracks ``n`` engine runs advanced in lockstep (e.g. stacked MPSO swarms)
+    against one ConvergenceCriteria, with every per-run counter held in an
+    array so an update costs a few vector operations however many runs there are.
+
+    Also records each run's ``best_iteration`` (when its final best was first
+    found; 0 = initial population) and, given ``target`` fitness values
+    (e.g. a warm start's prior best; NaN = none), ``target_reached_at``.
+    """
+
+    def __init__(self, criteria, max_iterations, n, target=None):
+        self.criteria = criteria or ConvergenceCriteria()
+        self.max_iterations = max_iterations
+        self.target = np.full(n, np.nan) if target is None else np.asarray(target, dtype=float)
+        self.iterations = np.zeros(n, dtype=int)
+        self.stop_reason = np.full(n, None, dtype=object)
+        self.best_iteration = np.zeros(n, dtype=int)
+        self.target_reached_at = np.full(n, -1)
+        self._reference = np.full(n, -np.inf)  # best fitness at the start of each run's current window
+        self._best = np.full(n, -np.inf)
+        self._stale = np.zeros(n, dtype=int)
+
+    def _rows(self, rows):
+        return np.arange(len(self.iterations)) if rows is None else np.asarray(rows)
+
+    def start(self, best_fitness, rows=None):
+        """Record the initial populations' best fitness (iteration 0)."""
+        rows = self._rows(rows)
+        best_fitness = np.asarray(best_fitness, dtype=float)
+        self._best[rows] = np.maximum(self._best[rows], best_fitness)
+        self._check_target(rows, best_fitness)
+
+    def _check_target(self, rows, best_fitness):
+        # Prior fitness is reported rounded to 4 decimals.
+        target = self.target[rows]
+        with np.errstate(invalid="ignore"):
+            reached = (self.target_reached_at[rows] < 0) & (best_fitness >= target - 5e-5)
+        self.target_reached_at[rows[reached]] = self.iterations[rows[reached]]
+
+    def update(self, best_fitness, diversity=None, rows=None):
+        """
+        Record one finished iteration of ``rows`` (default: every run);
+        returns a boolean array marking the runs that should stop.
+        """
+        rows = self._rows(rows)
+        best_fitness = np.asarray(best_fitness, dtype=float)
+        criteria = self.criteria
+        self.iterations[rows] += 1
+
+        reference = self._reference[rows]
+        improved = best_fitness - reference > criteria.min_delta
+        self._reference[rows] = np.where(improved, best_fitness, reference)
+        self._stale[rows] = np.where(improved, 0, self._stale[rows] + 1)
+        better = best_fitness > self._best[rows]
+        self._best[rows] = np.where(better, best_fitness, self._best[rows])
+        self.best_iteration[rows] = np.where(better, self.iterations[rows], self.best_iteration[rows])
+        self._check_target(rows, best_fitness)
+
+        stop = np.zeros(len(rows), dtype=bool)
+        if criteria.patience is not None:
+            stop = self._stale[rows] >= criteria.patience
+            # Distinguish "nothing moved" from "moved, but by less than min_delta".
+            moved = self._best[rows] > self._reference[rows]
+            self.stop_reason[rows[stop & moved]] = "below_tolerance"
+            self.stop_reason[rows[stop & ~moved]] = "no_improvement"
+        if criteria.min_diversity is not None and diversity is not None:
+            collapsed = ~stop & (np.asarray(diversity, dtype=float) < criteria.min_diversity)
+            self.stop_reason[rows[collapsed]] = "diversity_collapse"
+            stop = stop | collapsed
+        return stop
+
+    def report(self, i):
+        report = {
+            "stop_reason": self.stop_reason[i] or "max_iterations",
+            "iterations_used": int(self.iterations[i]),
+            "best_iteration": int(self.best_iteration[i]),
+        }
+        if not np.isnan(self.target[i]):
+            reached_at = int(self.target_reached_at[i])
+            report["target_reached_at"] = reached_at if reached_at >= 0 else None
+        return report
+
+
+class ConvergenceMonitor:
+    """Tracks one engine run against a ConvergenceCriteria (a BatchConvergenceMonitor of one run)."""
+
+    def __init__(self, criteria, max_iterations, target=None):
+        self._runs = BatchConvergenceMonitor(criteria, max_iterations, 1, None if target is None else [target])
+        self.criteria = self._runs.criteria
+        self.max_iterations = max_iterations
+
+    @property
+    def stop_reason(self):
+        return self._runs.stop_reason[0]
+
+    @stop_reason.setter
+    def stop_reason(self, reason):
+        self._runs.stop_reason[0] = reason
+
+    def start(self, best_fitness):
+        """Record the initial population's best fitness (iteration 0)."""
+        self._runs.start([best_fitness])
+
+    def update(self, best_fitness, diversity=None):
+        """Record one finished iteration; return True if the engine should stop."""
+        return bool(self._runs.update([best_fitness], None if diversity is None else [diversity])[0])
+
+    def report(self):
+        return self._runs.report(0)
+
+
+def diversity(positions, lower, upper):
+    """
+    Mean per-dimension standard deviation of ``positions``, normalized by the
+    bound width. Stacked ``(runs, n, dims)`` positions (with per-run bounds)
+    give one value per run.
+    """
+    positions = np.asarray(positions, dtype=float)
+    width = np.asarray(upper, dtype=float) - np.asarray(lower, dtype=float)
+    width = np.where(width <= 0, 1.0, width)
+    if positions.ndim == 3:
+        if positions.shape[1] < 2:
+            return np.zeros(len(positions))
+        return np.mean(positions.std(axis=1) / width.reshape(len(positions), -1), axis=1)
+    if len(positions) < 2:
+        return 0.0
+    return float(np.mean(positions.std(axis=0) / width))
@@ -0,0 +1,125 @@
+# services/engine_log.py
+
+import contextlib
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+
+ENGINE_LOGGER_NAME = "dealhive.engine"
+
+# Engine internals are silent unless explicitly turned up, e.g.
+# DEALHIVE_ENGINE_LOG_LEVEL=DEBUG for per-evaluation fitness breakdowns.
+_root = logging.getLogger(ENGINE_LOGGER_NAME)
+_root.setLevel(os.environ.get("DEALHIVE_ENGINE_LOG_LEVEL", "WARNING").upper())
+if not _root.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    _root.addHandler(_handler)
+    _root.propagate = False
+
+DEFAULT_RATE_LIMIT = int(os.environ.get("DEALHIVE_ENGINE_LOG_RATE", 50))  # lines per second
+
+_suppressed = contextvars.ContextVar("engine_log_suppressed", default=None)
+
+
+class SuppressedLines:
+    """Counter of engine log lines that were not emitted inside a tracking block."""
+
+    def __init__(self):
+        self.count = 0
+
+
+@contextlib.contextmanager
+def track_suppressed():
+    """Count every log line that is dropped (by level or rate limit) inside the block."""
+    counter = SuppressedLines()
+    token = _suppressed.set(counter)
+    try:
+        yield counter
+    finally:
+        _suppressed.reset(token)
+
+
+def _count_suppressed(lines):
+    counter = _suppressed.get()
+    if counter is not None:
+        counter.count += lines
+
+
+class EngineLogger:
+    """
+    Structured, leveled, rate-limited logger for engine internals.
+
+    Each call logs one ``event`` with key=value fields. Lines below the
+    configured level, or above ``rate_limit`` lines per second, are dropped and
+    counted in the surrounding track_suppressed() block.
+    """
+
+    def __init__(self, name, rate_limit=DEFAULT_RATE_LIMIT):
+        self._logger = logging.getLogger(f"{ENGINE_LOGGER_NAME}.{name}")
+        self.rate_limit = rate_limit
+        self._lock = threading.Lock()
+        self._window_start = 0.0
+        self._window_count = 0
+        self._window_dropped = 0
+
+    def enabled(self, level):
+        return self._logger.isEnabledFor(level)
+
+    def suppress(self, lines=1):
+        """Record ``lines`` lines as dropped without formatting anything."""
+        _count_suppressed(lines)
+
+    def log(self, level, event, **fields):
+        if not self._logger.isEnabledFor(level):
+            _count_suppressed(1)
+            return
+        dropped = self._admit()
+        if dropped is None:
+            _count_suppressed(1)
+            return
+        if dropped:
+            self._logger.log(level, "engine_log.rate_limited dropped=%d", dropped,
+                             extra={"event": "engine_log.rate_limited", "fields": {"dropped": dropped}})
+        message = " ".join([event] + [f"{key}={_format(value)}" for key, value in fields.items()])
+        self._logger.log(level, message, extra={"event": event, "fields": fields})
+
+    def _admit(self):
+        """Return None if the line is rate limited, else the count dropped in the previous window."""
+        if not self.rate_limit:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            dropped = 0
+            if now - self._window_start >= 1.0:
+                dropped = self._window_dropped
+                self._window_start = now
+                self._window_count = 0
+                self._window_dropped = 0
+            if self._window_count >= self.rate_limit:
+                self._window_dropped += 1
+                return None
+            self._window_count += 1
+            return dropped
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return value
+
+
+def get_engine_logger(name):
+    return EngineLogger(name)
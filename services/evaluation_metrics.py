@@ -1,8 +1,76 @@
-from sklearn.metrics import classification_report, confusion_matrix
+import os
+
 import numpy as np
-import pandas as pd
 
-def compute_confusion_metrics(true_labels, predicted_labels, algo_name=None):
+# "numpy" (default) counts with np.bincount; "sklearn" uses scikit-learn's
+# classification_report / confusion_matrix instead.
+METRICS_BACKEND = os.environ.get("DEALHIVE_METRICS_BACKEND", "numpy")
+
+
+def confusion_matrix(true_labels, predicted_labels):
+    """
+    Return ``(labels, matrix)``: the sorted union of labels and the
+    ``(k, k)`` count matrix (rows = true, columns = predicted), as
+    sklearn.metrics.confusion_matrix. One np.bincount over all pairs, so it
+    scales to millions of labels.
+    """
+    true_labels = np.asarray(true_labels)
+    predicted_labels = np.asarray(predicted_labels)
+    if true_labels.shape != predicted_labels.shape:
+        raise ValueError(
+            f"Found input variables with inconsistent numbers of samples: "
+            f"[{len(true_labels)}, {len(predicted_labels)}]"
+        )
+    if true_labels.size == 0:
+        raise ValueError("Found empty input array (e.g., `y_true` or `y_pred`) while a minimum of 1 sample is required.")
+    labels, codes = np.unique(np.concatenate([true_labels, predicted_labels]), return_inverse=True)
+    k = len(labels)
+    true_codes, predicted_codes = codes[:len(true_labels)], codes[len(true_labels):]
+    matrix = np.bincount(true_codes * k + predicted_codes, minlength=k * k).reshape(k, k)
+    return labels, matrix
+
+
+def _ratio(numerator, denominator):
+    # sklearn's zero_division default: 0.0 where the denominator is 0.
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def classification_report(labels, matrix):
+    """sklearn's ``classification_report(..., output_dict=True)`` computed from a confusion matrix."""
+    true_positives = np.diag(matrix).astype(float)
+    support = matrix.sum(axis=1).astype(float)
+    predicted = matrix.sum(axis=0).astype(float)
+    precision = _ratio(true_positives, predicted)
+    recall = _ratio(true_positives, support)
+    f1 = _ratio(2 * true_positives, support + predicted)
+    total = support.sum()
+
+    report = {
+        str(label): {
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1-score": float(f1[i]),
+            "support": float(support[i]),
+        }
+        for i, label in enumerate(labels.tolist())
+    }
+    report["accuracy"] = float(true_positives.sum() / total)
+    report["macro avg"] = {
+        "precision": float(precision.mean()),
+        "recall": float(recall.mean()),
+        "f1-score": float(f1.mean()),
+        "support": float(total),
+    }
+    report["weighted avg"] = {
+        "precision": float(np.average(precision, weights=support)),
+        "recall": float(np.average(recall, weights=support)),
+        "f1-score": float(np.average(f1, weights=support)),
+        "support": float(total),
+    }
+    return report
+
+
+def compute_confusion_metrics(true_labels, predicted_labels, algo_name=None, backend=None):
     """
     Compute evaluation metrics for classification: precision, recall, f1-score, support, and confusion matrix.
 
@@ -10,12 +78,19 @@ def compute_confusion_metrics(true_labels, predicted_labels, algo_name=None):
         true_labels (List[str/int]): Ground truth labels (e.g., 'ABC', 'PSO', 'GA')
         predicted_labels (List[str/int]): Predicted labels from algorithm results
         algo_name (str, optional): Label for output identification
+        backend (str, optional): "numpy" or "sklearn" (default: METRICS_BACKEND)
 
     Returns:
         Dict: Dictionary with detailed metrics and confusion matrix
     """
-    report = classification_report(true_labels, predicted_labels, output_dict=True)
-    conf_matrix = confusion_matrix(true_labels, predicted_labels)
+    if (backend or METRICS_BACKEND) == "sklearn":
+        from sklearn import metrics
+
+        report = metrics.classification_report(true_labels, predicted_labels, output_dict=True)
+        conf_matrix = metrics.confusion_matrix(true_labels, predicted_labels)
+    else:
+        labels, conf_matrix = confusion_matrix(true_labels, predicted_labels)
+        report = classification_report(labels, conf_matrix)
 
     result = {
         "algorithm": algo_name,
@@ -29,6 +104,8 @@ def print_metrics(result_dict):
     """
     Pretty print the results for debugging or logging.
     """
+    import pandas as pd
+
     algo = result_dict.get("algorithm", "N/A")
     print(f"\n📌 Metrics for: {algo}")
     print("Confusion Matrix:")
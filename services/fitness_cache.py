@@ -0,0 +1,65 @@
+# services/fitness_cache.py
+
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """
+    Bounded LRU memo of fitness values for one engine run.
+
+    Candidates are keyed on their values rounded to ``ndigits`` so float noise
+    from mutation/clamping does not defeat the cache. Misses are scored with a
+    single call to ``evaluate_batch`` (a function taking a list of candidates and
+    returning a list of fitness values).
+    """
+
+    def __init__(self, evaluate_batch, maxsize=4096, ndigits=6):
+        self._evaluate_batch = evaluate_batch
+        self.maxsize = maxsize
+        self.ndigits = ndigits
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, candidate):
+        return tuple(round(float(v), self.ndigits) for v in candidate)
+
+    def evaluate(self, candidates):
+        """Return fitness values for ``candidates``, scoring only unseen ones."""
+        results = [None] * len(candidates)
+        pending = OrderedDict()  # key -> indices of candidates that need it
+
+        for i, candidate in enumerate(candidates):
+            key = self.key(candidate)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                results[i] = self._entries[key]
+                self.hits += 1
+            elif key in pending:
+                # Duplicate inside the same batch: scored once, shared.
+                pending[key].append(i)
+                self.hits += 1
+            else:
+                pending[key] = [i]
+                self.misses += 1
+
+        if pending:
+            values = self._evaluate_batch([candidates[indices[0]] for indices in pending.values()])
+            for (key, indices), value in zip(pending.items(), values):
+                for i in indices:
+                    results[i] = value
+                self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return results
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -1,11 +1,15 @@
 import random
-import os
-import json
 from datetime import datetime
-from common_fitness import negotiation_fitness, quality_value_to_label
+from budget import Budget
+from common_fitness import negotiation_fitness_batch, quality_value_to_label
+from convergence import ConvergenceCriteria, ConvergenceMonitor, diversity
+from fitness_cache import FitnessCache
+from result_log import RESULT_LOG
+from warm_start import elite_slots, engine_offer
 
 class GA_Negotiation:
-    def __init__(self, population_size, generations, mutation_rate, bounds, user, manufacturer, weights):
+    def __init__(self, population_size, generations, mutation_rate, bounds, user, manufacturer, weights, convergence=None,
+                 deadline_ms=None, max_evaluations=None, seed=None, warm_start=None):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
@@ -13,74 +17,116 @@ class GA_Negotiation:
         self.user = user
         self.manufacturer = manufacturer
         self.weights = weights
+        self.convergence = ConvergenceCriteria.coerce(convergence)
+        self.budget = Budget(deadline_ms, max_evaluations)
+        self.rng = random.Random(seed)  # own generator, so a seed makes the run reproducible
+        # Offers from an earlier round to start from (see warm_start.engine_warm_start).
+        self.elites = warm_start["elites"] if warm_start else []
+        self.target_fitness = warm_start["target_fitness"] if warm_start else None
+        self.fitness_cache = FitnessCache(self.score_batch)
 
     def evaluate_fitness(self, chromosome):
-        mapped_offer = {
-            'price': chromosome[0],
-            'delivery': chromosome[1],
-            'quality': chromosome[2] / 100.0
-        }
-        return negotiation_fitness(mapped_offer, self.user, self.manufacturer, self.weights, verbose=True, algo_name="ga_mixed")
+        return self.evaluate_fitness_batch([chromosome])[0]
+
+    def evaluate_fitness_batch(self, population):
+        """Fitness of a list of chromosomes, re-using cached scores for duplicates."""
+        return self.fitness_cache.evaluate(population)
+
+    def score_batch(self, population):
+        """Score a list of [price, delivery, quality %] chromosomes in one call."""
+        self.budget.charge(len(population))
+        fitness, _, _ = negotiation_fitness_batch(
+            [c[0] for c in population],
+            [c[1] for c in population],
+            [c[2] / 100.0 for c in population],
+            self.user, self.manufacturer, self.weights, verbose=True, algo_name="ga_mixed"
+        )
+        return fitness.tolist()
 
     def initialize_population(self):
         population = []
         for _ in range(self.population_size):
             chrom = [
-                round(random.uniform(*self.bounds[0]), 2),
-                random.randint(*self.bounds[1]),
-                random.randint(*self.bounds[2])
+                round(self.rng.uniform(*self.bounds[0]), 2),
+                self.rng.randint(*self.bounds[1]),
+                self.rng.randint(*self.bounds[2])
             ]
             population.append(chrom)
+        # Warm start: the first chromosomes are the previous round's elites.
+        for i, elite in enumerate(self.elites[:elite_slots(self.population_size, self.elites)]):
+            population[i] = engine_offer(elite, self.bounds)
         return population
 
     def selection(self, population):
         # Higher fitness = better offer, so sort descending and keep the
         # fittest half.
-        population.sort(key=lambda x: self.evaluate_fitness(x), reverse=True)
-        return population[:len(population) // 2]  # top 50%
+        fitness = self.evaluate_fitness_batch(population)
+        ranked = sorted(range(len(population)), key=fitness.__getitem__, reverse=True)
+        return [population[i] for i in ranked[:len(population) // 2]]  # top 50%
 
     def crossover(self, parent1, parent2):
         # Uniform crossover
         return [
-            parent1[i] if random.random() < 0.5 else parent2[i]
+            parent1[i] if self.rng.random() < 0.5 else parent2[i]
             for i in range(3)
         ]
 
     def mutate(self, chromosome):
-        if random.random() < self.mutation_rate:
-            idx = random.randint(0, 2)
+        if self.rng.random() < self.mutation_rate:
+            idx = self.rng.randint(0, 2)
             # Interdependent mutation logic
             if idx == 0:  # price mutation
-                chromosome[0] = round(random.uniform(*self.bounds[0]), 2)
+                chromosome[0] = round(self.rng.uniform(*self.bounds[0]), 2)
                 if chromosome[0] > 4.5:
                     chromosome[2] = min(chromosome[2] + 5, self.bounds[2][1])  # more quality
             elif idx == 1:  # delivery mutation
-                chromosome[1] = random.randint(*self.bounds[1])
+                chromosome[1] = self.rng.randint(*self.bounds[1])
                 if chromosome[1] > 20:
                     chromosome[0] = max(chromosome[0] - 0.5, self.bounds[0][0])  # delayed, cheaper
             else:  # quality mutation
-                chromosome[2] = random.randint(*self.bounds[2])
+                chromosome[2] = self.rng.randint(*self.bounds[2])
                 if chromosome[2] < 85:
                     chromosome[0] = min(chromosome[0] + 0.3, self.bounds[0][1])  # low quality, increase price
         return chromosome
 
     def run(self):
+        self.budget.restart()
+        self.fitness_cache = FitnessCache(self.score_batch)
         population = self.initialize_population()
+        monitor = ConvergenceMonitor(self.convergence, self.generations, target=self.target_fitness)
+        lower, upper = zip(*self.bounds)
+
+        # Keep the best chromosome ever seen, so a run cut short by the
+        # convergence rules or the budget still returns its best-so-far.
+        fitness = self.evaluate_fitness_batch(population)
+        best_index = max(range(len(population)), key=fitness.__getitem__)
+        best, fitness_score = list(population[best_index]), fitness[best_index]
+        monitor.start(fitness_score)
 
         for _ in range(self.generations):
+            # A generation scores at most one new population of offspring.
+            if not self.budget.allows(self.population_size):
+                monitor.stop_reason = self.budget.exhausted_by
+                break
+
             selected = self.selection(population)
             offspring = []
 
             while len(offspring) < self.population_size:
-                p1, p2 = random.sample(selected, 2)
+                p1, p2 = self.rng.sample(selected, 2)
                 child = self.crossover(p1, p2)
                 child = self.mutate(child)
                 offspring.append(child)
 
             population = offspring
 
-        best = max(population, key=lambda x: self.evaluate_fitness(x))
-        fitness_score = self.evaluate_fitness(best)
+            fitness = self.evaluate_fitness_batch(population)
+            best_index = max(range(len(population)), key=fitness.__getitem__)
+            if fitness[best_index] > fitness_score:
+                best, fitness_score = list(population[best_index]), fitness[best_index]
+            if monitor.update(fitness_score, diversity(population, lower, upper)):
+                break
+
         result = {
             "manufacturerID": self.manufacturer["id"],
             "optimizedOffer": {
@@ -92,16 +138,19 @@ class GA_Negotiation:
             "metadata": {
                 "population_size": self.population_size,
                 "generations": self.generations,
+                **monitor.report(),
+                "evaluations": self.fitness_cache.misses,
+                "budget": self.budget.report(),
+                "fitness_cache": self.fitness_cache.stats(),
             },
         }
+        if self.elites:
+            result["metadata"]["elites_seeded"] = elite_slots(self.population_size, self.elites)
 
-        os.makedirs("results", exist_ok=True)
-        with open("results/ga_mixed_issue_results.json", "a") as f:
-            json.dump({
-                "timestamp": datetime.utcnow().isoformat(),
-                "result": result
-            }, f)
-            f.write("\n")
+        RESULT_LOG.summary("ga_mixed_issue_results.json", {
+            "timestamp": datetime.utcnow().isoformat(),
+            "result": result
+        })
 
         return result
 
@@ -0,0 +1,412 @@
+# services/islands.py
+
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from budget import Budget
+from convergence import ConvergenceCriteria, ConvergenceMonitor
+from engine_log import get_engine_logger
+from pso_engine import MAX_PARTICLES, Swarm
+from result_log import RESULT_LOG
+
+# Who sends its best particles to whom at each migration: "ring" (island i
+# to island i + 1), "fully_connected" (every island to every other) or
+# "random" (every island to one other island, drawn each migration).
+TOPOLOGIES = ("ring", "fully_connected", "random")
+# Resident island worker processes (see IslandWorkers). 0, the default, runs
+# every island in the calling process.
+PROCESSES = int(os.environ.get("DEALHIVE_MPSO_ISLAND_PROCESSES", 0))
+# Most islands one request may run in total (islands per manufacturer x manufacturers).
+MAX_ISLANDS = int(os.environ.get("DEALHIVE_MPSO_MAX_ISLANDS", 64))
+
+log = get_engine_logger("islands")
+
+
+class Island:
+    """
+    One MPSO swarm of an island run. It advances ``interval`` iterations at a
+    time, hands out its best personal bests as emigrants, and replaces its
+    worst particles with better immigrants. An island lives for its whole
+    run either in the calling process or in one resident island worker.
+    """
+
+    def __init__(self, index, user, manufacturer, weights, seed, num_particles, max_iters, convergence,
+                 deadline_ms, max_evaluations, elites=None, target_fitness=None):
+        start = time.process_time()
+        self.index = index
+        self.user = user
+        self.weights = weights
+        self.max_iters = max_iters
+        self.iteration = 0
+        self.received = 0
+        self.accepted = 0
+        rng = np.random.default_rng(seed)
+        self.swarm = Swarm([manufacturer], num_particles or int(rng.integers(5, MAX_PARTICLES + 1)), rng)
+        self.seeded = self.swarm.seed(0, elites) if elites else 0
+        self.monitor = ConvergenceMonitor(convergence, max_iters, target_fitness)
+        self.budget = Budget(deadline_ms, max_evaluations)
+
+        fitness = self.swarm.evaluate(user, weights)
+        self.budget.charge(self.swarm.num_particles)
+        self.swarm.init_bests(fitness)
+        self.monitor.start(self.swarm.global_best_fitness[0])
+        self.cpu_time = time.process_time() - start
+
+    @property
+    def done(self):
+        return self.monitor.stop_reason is not None or self.iteration >= self.max_iters
+
+    def advance(self, iterations, migrants):
+        """Run up to ``iterations`` iterations; return ``(positions, fitness, done)`` of ``migrants`` emigrants."""
+        start = time.process_time()
+        swarm = self.swarm
+        for _ in range(iterations):
+            if self.done:
+                break
+            if not self.budget.allows(swarm.num_particles):
+                self.monitor.stop_reason = self.budget.exhausted_by
+                break
+            swarm.step(self.iteration)
+            fitness = swarm.evaluate(self.user, self.weights)
+            self.budget.charge(swarm.num_particles)
+            swarm.update_bests(fitness)
+            self.iteration += 1
+            if self.monitor.update(swarm.global_best_fitness[0], swarm.diversity()[0]):
+                break
+        self.cpu_time += time.process_time() - start
+
+        best = np.argsort(swarm.local_best_fitness[0])[::-1][:migrants]
+        return swarm.local_bests[0, best], swarm.local_best_fitness[0, best], self.done
+
+    def receive(self, positions, fitness):
+        """
+        Pair the best immigrants with the worst particles (by personal best),
+        replacing each particle its immigrant beats. At most half the swarm is
+        replaced, so an island never loses its own search entirely.
+        """
+        swarm = self.swarm
+        self.received += len(fitness)
+        incoming = np.argsort(fitness)[::-1][:max(1, swarm.num_particles // 2)]
+        worst = np.argsort(swarm.local_best_fitness[0])[:len(incoming)]
+        better = fitness[incoming] > swarm.local_best_fitness[0, worst]
+        slots, incoming = worst[better], incoming[better]
+        if not len(slots):
+            return
+        swarm.positions[0, slots] = swarm.unclamped[0, slots] = swarm.local_bests[0, slots] = positions[incoming]
+        swarm.local_best_fitness[0, slots] = fitness[incoming]
+        best = incoming[0]
+        if fitness[best] > swarm.global_best_fitness[0]:
+            swarm.global_best[0] = positions[best]
+            swarm.global_best_fitness[0] = fitness[best]
+        self.accepted += len(slots)
+
+    def result(self):
+        report = self.monitor.report()
+        return {
+            "island": self.index,
+            "optimizedOffer": self.swarm.best_offer(0),
+            "fitness": round(float(self.swarm.global_best_fitness[0]), 4),
+            "num_particles": self.swarm.num_particles,
+            **report,
+            "evaluations_used": self.budget.evaluations,
+            "immigrants_received": self.received,
+            "immigrants_accepted": self.accepted,
+            "elites_seeded": self.seeded,
+            "cpu_time": round(self.cpu_time, 4),
+        }
+
+
+class _LocalIslands:
+    """Every island of one run, hosted in the calling process."""
+
+    def __init__(self, specs):
+        self.islands = {spec["index"]: Island(**spec) for spec in specs}
+
+    def advance(self, iterations, migrants, arrivals):
+        """Deliver ``arrivals`` (``{index: (positions, fitness)}``), then run one epoch; returns the emigrants by index."""
+        for index, (positions, fitness) in arrivals.items():
+            self.islands[index].receive(positions, fitness)
+        return {index: island.advance(iterations, migrants) for index, island in self.islands.items()}
+
+    def finish(self):
+        return [island.result() for island in self.islands.values()]
+
+
+def _serve(conn):
+    """
+    Resident island worker: hosts the islands of whichever run has it
+    checked out and answers that run's commands over ``conn``.
+    """
+    hosts = None
+    while True:
+        try:
+            command, argument = conn.recv()
+        except EOFError:
+            return
+        try:
+            if command == "create":
+                hosts, reply = _LocalIslands(argument), None
+            elif command == "advance":
+                reply = hosts.advance(*argument)
+            elif command == "finish":
+                hosts, reply = None, hosts.finish()
+            else:
+                return
+            conn.send(("ok", reply))
+        except Exception as e:
+            hosts = None
+            conn.send(("error", e))
+        finally:
+            # Worker processes are terminated, never exit normally, so nothing flushes at exit.
+            RESULT_LOG.flush()
+
+
+class WorkerLost(Exception):
+    """A resident island worker died or its pipe broke mid-run."""
+
+
+class _ResidentIslands:
+    """
+    The islands of one run spread over checked-out resident workers. Each
+    worker builds its islands once; after that only emigrants, immigrants
+    and done flags cross the pipes.
+    """
+
+    def __init__(self, workers, specs):
+        self.workers = workers
+        self.owner = {spec["index"]: i % len(workers) for i, spec in enumerate(specs)}
+        self._call("create", [[spec for spec in specs if self.owner[spec["index"]] == worker]
+                              for worker in range(len(workers))])
+
+    def _call(self, command, arguments):
+        """Send one command to every worker, then collect every reply, so all of them run at once."""
+        try:
+            for (_, conn), argument in zip(self.workers, arguments):
+                conn.send((command, argument))
+            replies = [conn.recv() for _, conn in self.workers]
+        except (EOFError, OSError) as e:
+            raise WorkerLost(str(e)) from e
+        for status, reply in replies:
+            if status == "error":
+                raise reply
+        return [reply for _, reply in replies]
+
+    def advance(self, iterations, migrants, arrivals):
+        per_worker = [{} for _ in self.workers]
+        for index, batch in arrivals.items():
+            per_worker[self.owner[index]][index] = batch
+        outgoing = {}
+        for reply in self._call("advance", [(iterations, migrants, batch) for batch in per_worker]):
+            outgoing.update(reply)
+        return outgoing
+
+    def finish(self):
+        return [report for reply in self._call("finish", [None] * len(self.workers)) for report in reply]
+
+
+class IslandWorkers:
+    """
+    Resident processes for island-model MPSO. A run checks out one idle
+    worker per island (fewer if not enough are idle, in which case some
+    host several islands; none, and it runs in-process), keeps its islands
+    there until it finishes, and hands the workers back.
+
+    Workers are only used once ``start()`` has run (the app does it at
+    startup), so processes that merely import this module, such as
+    manufacturer pool workers, never start any.
+    """
+
+    def __init__(self, processes=PROCESSES):
+        self.processes = processes
+        self._idle = []
+        self._running = False
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._running
+
+    def _spawn(self):
+        from worker_pool import START_METHOD
+
+        context = multiprocessing.get_context(START_METHOD)
+        conn, child_conn = context.Pipe()
+        process = context.Process(target=_serve, args=(child_conn,), name="mpso-island", daemon=True)
+        process.start()
+        child_conn.close()
+        return process, conn
+
+    @staticmethod
+    def _stop(worker):
+        process, conn = worker
+        conn.close()
+        process.terminate()
+        process.join()
+
+    def start(self):
+        with self._lock:
+            if self._running or self.processes < 1:
+                return
+            self._idle = [self._spawn() for _ in range(self.processes)]
+            self._running = True
+        log.info("islands.workers_started", processes=self.processes)
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle, self._running = self._idle, [], False
+        for worker in idle:
+            self._stop(worker)
+
+    def checkout(self, n):
+        """Up to ``n`` idle workers, or none if the workers are not running."""
+        with self._lock:
+            taken, self._idle = self._idle[:n], self._idle[n:]
+        return taken
+
+    def checkin(self, workers, broken=False):
+        """
+        Return a run's workers. After a failure their pipes may hold unread
+        replies, so ``broken`` workers are all replaced with fresh ones.
+        """
+        with self._lock:
+            if self._running and not broken:
+                self._idle.extend(workers)
+                return
+            if self._running:
+                self._idle.extend(self._spawn() for _ in workers)
+        for worker in workers:
+            self._stop(worker)
+
+
+ISLAND_WORKERS = IslandWorkers()
+
+
+def migration_routes(topology, islands, rng):
+    """The ``(source, destination)`` island pairs of one migration."""
+    if islands < 2:
+        return []
+    if topology == "ring":
+        return [(i, (i + 1) % islands) for i in range(islands)]
+    if topology == "fully_connected":
+        return [(i, j) for i in range(islands) for j in range(islands) if i != j]
+    # "random": shift each destination by 1..islands-1 so no island sends to itself.
+    return [(i, int((i + rng.integers(1, islands)) % islands)) for i in range(islands)]
+
+
+def _coordinate(hosts, islands, topology, migration_interval, migrants, routing_seed):
+    """Run epochs on ``hosts`` until every island is done; returns ``(island reports, migrations)``."""
+    routing = np.random.default_rng(routing_seed)
+    migrations = 0
+    arrivals = {}
+    while True:
+        outgoing = hosts.advance(migration_interval, migrants, arrivals)
+        if all(done for _, _, done in outgoing.values()):
+            break
+        batches = {}
+        for source, destination in migration_routes(topology, islands, routing):
+            if not outgoing[destination][2]:
+                batches.setdefault(destination, []).append(outgoing[source])
+        arrivals = {
+            destination: (np.concatenate([p for p, _, _ in batch]), np.concatenate([f for _, f, _ in batch]))
+            for destination, batch in batches.items()
+        }
+        migrations += 1
+    return sorted(hosts.finish(), key=lambda r: r["island"]), migrations
+
+
+def run_mpso_islands(user, manufacturer, weights, islands=4, migration_interval=5, migrants=1, topology="ring",
+                     max_iters=50, num_particles=None, seed=None, convergence=None, deadline_ms=None,
+                     max_evaluations=None, warm_start=None, processes=None):
+    """
+    Island-model MPSO for one manufacturer: ``islands`` independent swarms
+    that every ``migration_interval`` iterations send their ``migrants`` best
+    particles to their neighbours in ``topology`` (see TOPOLOGIES).
+
+    With the resident island workers running (ISLAND_WORKERS) and
+    ``processes`` not False, the islands live in those workers for the whole
+    run, so they iterate side by side on separate cores and each migration
+    only moves the migrants. Otherwise, or if a worker dies (the run is then
+    redone here), they run in the calling process. Migration is synchronous,
+    so for a given ``seed`` the result is the same either way.
+
+    An island that converges stops iterating but keeps sending its best to
+    the others. ``max_evaluations`` is split evenly between the islands;
+    ``deadline_ms`` applies to each. ``warm_start`` (see
+    warm_start.engine_warm_start) seeds island 0 only and migration spreads
+    the elites, so the other islands still start at random; every island
+    watches for the target fitness.
+
+    Returns the best island's offer in the run_mpso result shape, with
+    per-island statistics in ``metadata.islands``.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"unknown topology {topology!r}, expected one of {TOPOLOGIES}")
+    if islands < 1 or migration_interval < 1 or migrants < 1:
+        raise ValueError("islands, migration_interval and migrants must be at least 1")
+    convergence = ConvergenceCriteria.coerce(convergence)
+    seeds = np.random.SeedSequence(seed).spawn(islands + 1)
+    budget = Budget(deadline_ms, max_evaluations)
+
+    specs = [
+        {
+            "index": i, "user": user, "manufacturer": manufacturer, "weights": weights, "seed": seeds[i],
+            "num_particles": num_particles, "max_iters": max_iters, "convergence": convergence,
+            "deadline_ms": deadline_ms,
+            "max_evaluations": None if max_evaluations is None else max(1, max_evaluations // islands),
+            "elites": warm_start["elites"] if warm_start and i == 0 else None,
+            "target_fitness": warm_start["target_fitness"] if warm_start else None,
+        }
+        for i in range(islands)
+    ]
+    workers = ISLAND_WORKERS.checkout(islands) if (processes is None or processes) and islands > 1 else []
+    resident = False
+    if workers:
+        broken = False
+        try:
+            reports, migrations = _coordinate(_ResidentIslands(workers, specs), islands, topology,
+                                              migration_interval, migrants, seeds[-1])
+            resident = True
+        except WorkerLost as e:
+            # The islands died with the worker; redo the run here from the same seeds.
+            log.warning("islands.worker_lost", manufacturer_id=manufacturer["id"], error=e)
+            broken = True
+        finally:
+            ISLAND_WORKERS.checkin(workers, broken)
+    if not resident:
+        reports, migrations = _coordinate(_LocalIslands(specs), islands, topology, migration_interval, migrants,
+                                          seeds[-1])
+
+    best = max(reports, key=lambda r: r["fitness"])
+    metadata = {
+        'num_particles': sum(r["num_particles"] for r in reports),
+        'max_iters': max_iters,
+        'stop_reason': best["stop_reason"],
+        'iterations_used': max(r["iterations_used"] for r in reports),
+        'best_iteration': best["best_iteration"],
+        'budget': {**budget.report(), 'evaluations_used': sum(r["evaluations_used"] for r in reports)},
+        'islands': [{k: v for k, v in r.items() if k != "optimizedOffer"} for r in reports],
+        'migration': {
+            'topology': topology,
+            'interval': migration_interval,
+            'migrants': migrants,
+            'migrations': migrations,
+            'immigrants_accepted': sum(r["immigrants_accepted"] for r in reports),
+        },
+        'processes': resident,
+    }
+    if warm_start:
+        reached = [r["target_reached_at"] for r in reports if r.get("target_reached_at") is not None]
+        metadata['target_reached_at'] = min(reached) if reached else None
+        metadata['elites_seeded'] = reports[0]["elites_seeded"]
+    log.info("islands.finished", manufacturer_id=manufacturer["id"], islands=islands, topology=topology,
+             migrations=migrations, best_island=best["island"], fitness=best["fitness"])
+    return {
+        'manufacturerID': manufacturer['id'],
+        'optimizedOffer': best["optimizedOffer"],
+        'fitness': best["fitness"],
+        'metadata': metadata,
+    }
@@ -0,0 +1,119 @@
+# services/jobs.py
+
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from engine_log import get_engine_logger
+
+JOB_WORKERS = int(os.environ.get("DEALHIVE_JOB_WORKERS", 4))
+# Finished jobs are kept this long (seconds) for GET /jobs/{id}.
+JOB_RETENTION = float(os.environ.get("DEALHIVE_JOB_RETENTION", 3600))
+CALLBACK_TIMEOUT = float(os.environ.get("DEALHIVE_JOB_CALLBACK_TIMEOUT", 10))
+
+log = get_engine_logger("jobs")
+
+
+class Job:
+    def __init__(self, kind, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.callback_url = callback_url
+        self.callback_status = None
+
+    @property
+    def done(self):
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self, include_result=True):
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if self.callback_url:
+            data["callback_status"] = self.callback_status
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobStore:
+    """
+    In-memory background jobs for long-running comparisons.
+
+    Work runs on a small thread pool (which in turn feeds the manufacturer
+    process pool), so the event loop only ever creates and looks up jobs.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, retention=JOB_RETENTION):
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, callback_url=None):
+        """Queue ``fn(*args)`` and return its Job immediately."""
+        job = Job(kind, callback_url)
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args)
+            job.status = "succeeded"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        job.finished_at = time.time()
+        if job.callback_url:
+            self._notify(job)
+
+    def _notify(self, job):
+        """POST the finished job to its callback URL; failures are recorded, not raised."""
+        body = json.dumps(job.to_dict()).encode("utf-8")
+        request = urllib.request.Request(
+            job.callback_url, data=body, method="POST",
+            headers={"Content-Type": "application/json", "X-Job-Id": job.id},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=CALLBACK_TIMEOUT) as response:
+                job.callback_status = response.status
+        except Exception as e:
+            job.callback_status = f"error: {e}"
+            log.warning("jobs.callback_failed", job_id=job.id, error=e)
+
+    def _evict(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+JOBS = JobStore()
@@ -1,6 +1,19 @@
+import os
+
 import numpy as np
-from scipy.spatial import distance
-from pygmo import hypervolume
+
+import quality_indicators
+from engine_log import get_engine_logger
+
+try:  # Optional: only used to cross-check the NumPy hypervolume.
+    import pygmo
+except ImportError:
+    pygmo = None
+
+# Set to 1 to recompute every hypervolume with pygmo (if installed) and log mismatches.
+HV_CROSS_CHECK = os.environ.get("DEALHIVE_HV_CROSS_CHECK", "0") == "1"
+
+log = get_engine_logger("pareto")
 
 
 def is_dominated(p1, p2):
@@ -8,47 +21,113 @@ def is_dominated(p1, p2):
 
 
 def get_pareto_front(points):
-    """Extract non-dominated solutions"""
-    points = np.array(points)
-    pareto_front = []
-    for i, p in enumerate(points):
-        if not any(is_dominated(p, q) for j, q in enumerate(points) if i != j):
-            pareto_front.append(p.tolist())
-    return pareto_front
+    """
+    Extract non-dominated solutions (both objectives maximized, as in
+    ``is_dominated``), in input order. Duplicates of a front point are kept.
+
+    O(n log n): sort by the first objective descending, then keep a point
+    only if it has the highest second objective among points sharing its
+    first objective and beats every point with a strictly larger one.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return []
+    x, y = points[:, 0], points[:, 1]
+    order = np.lexsort((-y, -x))
+    xs, ys = x[order], y[order]
+
+    new_group = np.r_[True, xs[1:] != xs[:-1]]
+    group = np.cumsum(new_group) - 1
+    group_max = ys[new_group]  # y is descending within a group
+    best_before = np.r_[-np.inf, np.maximum.accumulate(group_max)[:-1]]
+
+    keep = np.empty(len(points), dtype=bool)
+    keep[order] = (ys == group_max[group]) & (ys > best_before[group])
+    return points[keep].tolist()
 
 
 def calculate_igd(solution_set, reference_set):
     """Inverted Generational Distance (lower = better)"""
-    distances = []
-    for ref_point in reference_set:
-        min_dist = min(distance.euclidean(ref_point, sol) for sol in solution_set)
-        distances.append(min_dist)
-    return np.mean(distances)
+    return quality_indicators.igd(solution_set, reference_set)
+
+
+def _hv_front(points, reference_point):
+    """
+    Validate a point set for the 2-D hypervolume (minimization, like pygmo)
+    and return ``(points, front_index, ref)``: the indices of its
+    non-dominated points sorted by the first objective ascending (so the
+    second objective strictly decreases). Duplicates appear once.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    ref = np.asarray(reference_point, dtype=float)
+    if np.any(points > ref):
+        raise ValueError("Every point must weakly dominate the reference point (minimization)")
+    order = np.lexsort((points[:, 1], points[:, 0]))
+    ys = points[order, 1]
+    lowest_before = np.r_[np.inf, np.minimum.accumulate(ys)[:-1]]
+    return points, order[ys < lowest_before], ref
+
+
+def _front_boxes(points, front, ref):
+    """Widths/heights of the box between each front point and its neighbours."""
+    xs, ys = points[front, 0], points[front, 1]
+    return np.r_[xs[1:], ref[0]] - xs, np.r_[ref[1], ys[:-1]] - ys
 
 
 def calculate_hypervolume(pareto_front, reference_point):
-    """Hypervolume (higher = better)"""
-    hv = hypervolume(pareto_front)
-    return hv.compute(reference_point)
+    """Hypervolume (higher = better), exact 2-D sweep with pygmo's minimization semantics."""
+    points, front, ref = _hv_front(pareto_front, reference_point)
+    widths, _ = _front_boxes(points, front, ref)
+    hv = float(np.sum(widths * (ref[1] - points[front, 1])))
+
+    if HV_CROSS_CHECK and pygmo is not None and len(points):
+        expected = pygmo.hypervolume(points.tolist()).compute(ref.tolist())
+        if not np.isclose(hv, expected, rtol=1e-9, atol=1e-12):
+            log.warning("pareto.hv_mismatch", numpy=hv, pygmo=expected, points=len(points))
+    return hv
 
 
 def calculate_hv_contributions(pareto_front, reference_point):
-    """Compute per-point HV contribution (used for ranking/archiving)"""
-    base_hv = calculate_hypervolume(pareto_front, reference_point)
-    contributions = []
-    for i in range(len(pareto_front)):
-        reduced_front = pareto_front[:i] + pareto_front[i+1:]
-        hv_reduced = calculate_hypervolume(reduced_front, reference_point)
-        contrib = base_hv - hv_reduced
-        contributions.append(round(contrib, 6))
-    return contributions
+    """
+    Compute per-point HV contribution (used for ranking/archiving): the
+    hypervolume lost if that point alone were removed.
+
+    A front point's exclusive region is the box between its neighbours on
+    the front, minus whatever the points it dominates cover inside that box.
+    Each dominated point lies in exactly one such box (the one whose x-slab
+    holds it), so one sort plus one small sweep per occupied box is exact.
+    Dominated points contribute 0.
+    """
+    points, front, ref = _hv_front(pareto_front, reference_point)
+    contributions = np.zeros(len(points))
+    if not len(front):
+        return []
+
+    widths, heights = _front_boxes(points, front, ref)
+    contributions[front] = widths * heights
+
+    dominated = np.setdiff1d(np.arange(len(points)), front)
+    if len(dominated):
+        xs, ys = points[front, 0], points[front, 1]
+        slab = np.searchsorted(xs, points[dominated, 0], side="right") - 1
+        # The box's far corner is the local reference point.
+        corner_x, corner_y = np.r_[xs[1:], ref[0]], np.r_[ref[1], ys[:-1]]
+        for k in np.unique(slab):
+            inside = points[dominated[slab == k]]
+            inside = inside[inside[:, 1] < corner_y[k]]
+            if len(inside):
+                local, local_front, local_ref = _hv_front(inside, [corner_x[k], corner_y[k]])
+                local_widths, _ = _front_boxes(local, local_front, local_ref)
+                covered = np.sum(local_widths * (local_ref[1] - local[local_front, 1]))
+                contributions[front[k]] -= covered
+    return [round(float(c), 6) for c in contributions]
 
 
 def calculate_pareto_metrics(algorithm_data, reference_point=None):
     """
     Evaluate Pareto metrics for all algorithms:
     - Pareto front size
-    - IGD
+    - IGD, GD, IGD+, spacing and spread (see quality_indicators)
     - Hypervolume
     - HV contribution per solution (optional for ranking)
     """
@@ -73,6 +152,10 @@ def calculate_pareto_metrics(algorithm_data, reference_point=None):
         metrics[algo] = {
             "pareto_size": len(pareto_front),
             "igd": round(igd, 5),
+            "gd": round(quality_indicators.gd(pareto_front, all_points), 5),
+            "igd_plus": round(quality_indicators.igd_plus(pareto_front, all_points), 5),
+            "spacing": round(quality_indicators.spacing(pareto_front), 5),
+            "spread": round(quality_indicators.spread(pareto_front, all_points), 5),
             "hypervolume": round(hv, 5),
             "hv_contributions": hv_contribs,
             "max_hv_contrib": round(max(hv_contribs), 6),
@@ -80,3 +163,114 @@ def calculate_pareto_metrics(algorithm_data, reference_point=None):
         }
 
     return metrics
+
+
+def _batch_front_mask(points, mask):
+    """
+    ``(S, K)`` mask of the non-dominated points (maximization, as in
+    ``get_pareto_front``) of every padded set. Pairwise within each set, so
+    meant for many small sets, e.g. one point per algorithm per manufacturer.
+    """
+    ge = (points[:, None, :, :] >= points[:, :, None, :]).all(axis=3)  # [s, i, j]: j >= i
+    gt = (points[:, None, :, :] > points[:, :, None, :]).any(axis=3)
+    dominated = (ge & gt & mask[:, None, :]).any(axis=2)
+    return mask & ~dominated
+
+
+def batch_hypervolume(points, mask, reference_point):
+    """``(S,)`` exact 2-D hypervolume (minimization, like pygmo) of every padded set."""
+    ref = np.broadcast_to(np.asarray(reference_point, dtype=float), (len(points), 2))
+    if np.any(mask & (points > ref[:, None, :]).any(axis=2)):
+        raise ValueError("Every point must weakly dominate the reference point (minimization)")
+    x = np.where(mask, points[:, :, 0], np.inf)
+    y = np.where(mask, points[:, :, 1], np.inf)
+    order = np.lexsort((y, x), axis=1)
+    xs, ys = np.take_along_axis(x, order, axis=1), np.take_along_axis(y, order, axis=1)
+
+    lowest_before = np.concatenate([np.full((len(ys), 1), np.inf), np.minimum.accumulate(ys, axis=1)[:, :-1]], axis=1)
+    front = ys < lowest_before
+    # x of the next front point to the right (the reference point after the last).
+    front_x = np.where(front, xs, np.inf)
+    next_x = np.minimum.accumulate(front_x[:, ::-1], axis=1)[:, ::-1]
+    next_x = np.minimum(np.concatenate([next_x[:, 1:], np.full((len(xs), 1), np.inf)], axis=1), ref[:, :1])
+    areas = (next_x - np.where(front, xs, 0.0)) * (ref[:, 1:] - np.where(front, ys, 0.0))
+    return np.where(front, areas, 0.0).sum(axis=1)
+
+
+def batch_hv_contributions(points, mask, reference_point):
+    """``(S, K)`` hypervolume lost by removing each valid point of each set (leave-one-out, batched)."""
+    sets, k = mask.shape
+    ref = np.broadcast_to(np.asarray(reference_point, dtype=float), (sets, 2))
+    full = batch_hypervolume(points, mask, ref)
+    without = mask[:, None, :] & ~np.eye(k, dtype=bool)[None]
+    reduced = batch_hypervolume(
+        np.repeat(points, k, axis=0), without.reshape(sets * k, k), np.repeat(ref, k, axis=0)
+    ).reshape(sets, k)
+    return np.where(mask, full[:, None] - reduced, 0.0)
+
+
+INDICATORS = ("igd", "gd", "igd_plus", "spacing", "spread", "hypervolume")
+
+
+def calculate_pareto_metrics_batch(groups, reference_point=None):
+    """
+    ``calculate_pareto_metrics`` for many groups (e.g. manufacturers) in one
+    vectorized pass. ``groups`` is a list of ``{algorithm: points}`` dicts.
+
+    Returns ``{"groups": [per-group metrics], "aggregate": {...}}``; each
+    per-group entry has the same shape as ``calculate_pareto_metrics``, and
+    ``aggregate`` holds every algorithm's mean indicator values (and how
+    often it had the largest hypervolume) across groups. Without a
+    ``reference_point`` each group gets its own, as in the single-group call.
+    """
+    sets = [(g, algo, points) for g, data in enumerate(groups) for algo, points in data.items()]
+    if not sets:
+        return {"groups": [], "aggregate": {"groups": 0, "algorithms": {}}}
+    owner = np.array([g for g, _, _ in sets])
+
+    points, mask = quality_indicators.pack([p for _, _, p in sets])
+    reference, reference_mask = quality_indicators.pack(
+        [[p for points in data.values() for p in points] for data in groups]
+    )
+    reference, reference_mask = reference[owner], reference_mask[owner]
+
+    if reference_point is None:
+        ref = np.where(reference_mask[:, :, None], reference, -np.inf).max(axis=1) * 1.1
+    else:
+        ref = np.broadcast_to(np.asarray(reference_point, dtype=float), (len(sets), 2))
+
+    front = _batch_front_mask(points, mask)
+    values = {
+        "igd": quality_indicators.igd(points, reference, front, reference_mask),
+        "gd": quality_indicators.gd(points, reference, front, reference_mask),
+        "igd_plus": quality_indicators.igd_plus(points, reference, front, reference_mask),
+        "spacing": quality_indicators.spacing(points, front),
+        "spread": quality_indicators.spread(points, reference, front, reference_mask),
+        "hypervolume": batch_hypervolume(points, front, ref),
+    }
+    contributions = batch_hv_contributions(points, front, ref)
+
+    per_group = [{} for _ in groups]
+    for s, (g, algo, _) in enumerate(sets):
+        contribs = [round(float(c), 6) for c in contributions[s][front[s]]]
+        per_group[g][algo] = {
+            "pareto_size": int(front[s].sum()),
+            **{name: round(float(values[name][s]), 5) for name in INDICATORS},
+            "hv_contributions": contribs,
+            "max_hv_contrib": round(max(contribs), 6),
+            "avg_hv_contrib": round(float(np.mean(contribs)), 6),
+        }
+
+    algorithms = {}
+    algo_names = np.array([algo for _, algo, _ in sets])
+    best_hv = np.full(len(groups), -np.inf)
+    np.maximum.at(best_hv, owner, values["hypervolume"])
+    for algo in dict.fromkeys(algo_names.tolist()):
+        rows = algo_names == algo
+        algorithms[algo] = {
+            "groups": int(rows.sum()),
+            **{f"mean_{name}": round(float(np.nanmean(values[name][rows])), 5) for name in INDICATORS},
+            "hv_wins": int((values["hypervolume"][rows] == best_hv[owner[rows]]).sum()),
+        }
+    return {"groups": per_group, "aggregate": {"groups": len(groups), "algorithms": algorithms}}
+
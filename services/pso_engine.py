@@ -1,235 +1,414 @@
 import json
-import random
+import logging
 import os
 from datetime import datetime
-from common_fitness import negotiation_fitness, QUALITY_MAP
+
+import numpy as np
+
+from budget import Budget
+from common_fitness import QUALITY_MAP, manufacturer_columns, negotiation_fitness_stacked
+from convergence import BatchConvergenceMonitor, ConvergenceCriteria, diversity
+from engine_log import get_engine_logger
+from result_log import RESULT_LOG
+from warm_start import elite_slots
 
 # Constants
 REVERSE_QUALITY_MAP = {v: k for k, v in QUALITY_MAP.items()}
+# Swarm size when none is given: drawn from 5..MAX_PARTICLES.
+MAX_PARTICLES = 10
 BASE_SOCIAL = 1.5
 COGNITIVE = 1.5
 INERTIA = 0.5
-
-def run_mpso(user, manufacturers, weights, max_iters=50):
-    best_offers = []
-    full_logs = []  # Flat log for all events
-    structured_logs = []  # Manufacturer-structured logs
-
-    for m in manufacturers:
-        # Initialize manufacturer log
-        m_log = {
-            "manufacturer_id": m["id"],
-            "num_particles": random.randint(5, 10),
-            "price_range": [m["minPrice"], m["initialOffer"]["price"]],
-            "delivery_range": [m["minDelivery"], m["initialOffer"]["delivery"]],
-            "quality_options": m["qualities"],
-            "iterations": []
+DIMS = ("price", "delivery", "quality")
+QUALITY_LABELS = np.array(["Economy", "Standard", "Premium"])
+QUALITY_LEVELS = np.array([QUALITY_MAP[label] for label in QUALITY_LABELS])
+
+# How much round history run_mpso keeps: "none", "curve" (best fitness per
+# iteration), "summary" (best/mean fitness, diversity and new global bests per
+# iteration) or "full" (summary, plus every particle's position, velocity and
+# fitness saved as arrays to an .npz file under TRACE_DIR).
+TRACE_LEVELS = ("none", "curve", "summary", "full")
+TRACE_LEVEL = os.environ.get("DEALHIVE_MPSO_TRACE", "summary")
+TRACE_DIR = os.environ.get("DEALHIVE_MPSO_TRACE_DIR", "outputs")
+# Set to 1 to stack every manufacturer's swarm into one array by default.
+BATCHED = os.environ.get("DEALHIVE_MPSO_BATCHED", "0") == "1"
+
+log = get_engine_logger("mpso")
+
+
+class Swarm:
+    """
+    Structure-of-arrays particle swarms, one per manufacturer, stacked.
+
+    Positions, velocities and personal bests are ``(swarms, particles, 3)``
+    arrays with columns price, delivery, quality (0-1). Bounds are per-swarm
+    ``(swarms, 1, 3)`` arrays, and each swarm keeps its own global best and
+    contribution counters, so every swarm in the stack moves in the same few
+    vector operations per iteration. A stack of one is a single swarm.
+    """
+
+    def __init__(self, manufacturers, num_particles, rng):
+        self.manufacturers = list(manufacturers)
+        self.rng = rng
+        # Position of each swarm in the original stack (swarms that stop early are dropped).
+        self.rows = np.arange(len(self.manufacturers))
+        self.constraints = manufacturer_columns(self.manufacturers)
+        shape = (len(self.manufacturers), num_particles)
+        self.lower = np.array([[m["minPrice"], m["minDelivery"], 0.3] for m in self.manufacturers], dtype=float)[:, None, :]
+        self.upper = np.array([[m["initialOffer"]["price"], m["initialOffer"]["delivery"], 1.0]
+                               for m in self.manufacturers], dtype=float)[:, None, :]
+
+        # Every particle starts at one of its manufacturer's qualities, picked uniformly.
+        offered = np.array([[label in m["qualities"] for label in QUALITY_LABELS] for m in self.manufacturers])
+        picks = np.argmax(rng.random(shape + (len(QUALITY_LABELS),)) * offered[:, None, :], axis=2)
+        self.positions = np.stack([
+            rng.uniform(self.lower[:, :, 0], self.upper[:, :, 0], shape),
+            rng.integers(self.lower[:, :, 1].astype(int), self.upper[:, :, 1].astype(int) + 1, shape),
+            QUALITY_LEVELS[picks],
+        ], axis=2).astype(float)
+        self.velocities = rng.uniform([-1.0, -1.0, -0.2], [1.0, 1.0, 0.2], shape + (len(DIMS),))
+        # Positions after the velocity step but before constraints (logged as "new_value").
+        self.unclamped = self.positions.copy()
+
+        self.local_bests = self.positions.copy()
+        self.local_best_fitness = np.full(shape, -np.inf)
+        self.global_best = self.positions[:, 0].copy()
+        self.global_best_fitness = np.full(len(self.manufacturers), -np.inf)
+        self.contributions = np.zeros(shape, dtype=int)
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def num_particles(self):
+        return self.positions.shape[1]
+
+    def seed(self, k, elites):
+        """
+        Replace swarm ``k``'s first particles with ``elites`` (offers from an
+        earlier round), clamped to its manufacturer's bounds and qualities.
+        Returns how many particles were seeded.
+        """
+        count = elite_slots(self.num_particles, elites)
+        offered = np.array([QUALITY_MAP[q] for q in self.manufacturers[k]["qualities"]])
+        for i, elite in enumerate(elites[:count]):
+            quality = QUALITY_MAP.get(elite["quality"], QUALITY_MAP["Standard"])
+            self.positions[k, i] = [elite["price"], np.trunc(elite["delivery"]),
+                                    offered[np.argmin(np.abs(offered - quality))]]
+        np.clip(self.positions[k], self.lower[k], self.upper[k], out=self.positions[k])
+        self.unclamped[k] = self.positions[k]
+        return count
+
+    def quality_index(self):
+        """Index into QUALITY_LABELS of every particle's offered quality."""
+        rounded = np.round(self.positions[..., 2], 1)
+        # Anything that does not round onto a label is offered as Standard.
+        return np.where(rounded == 0.3, 0, np.where(rounded == 1.0, 2, 1))
+
+    def evaluate(self, user, weights):
+        """Score every particle of every swarm with one negotiation_fitness_stacked call."""
+        fitness, _, _ = negotiation_fitness_stacked(
+            self.positions[..., 0],
+            np.trunc(self.positions[..., 1]),
+            QUALITY_LEVELS[self.quality_index()],
+            user, self.manufacturers, weights, constraints=self.constraints
+        )
+        return fitness
+
+    def step(self, iteration):
+        """Velocity/position update for every particle, then clamp to each manufacturer's bounds."""
+        r1 = self.rng.random(self.positions.shape)
+        r2 = self.rng.random(self.positions.shape)
+        # Dynamic social factor: particles that improved the global best pull harder.
+        social_factor = BASE_SOCIAL + self.contributions / (iteration + 1)
+
+        self.velocities = (
+            INERTIA * self.velocities +
+            COGNITIVE * r1 * (self.local_bests - self.positions) +
+            social_factor[..., None] * r2 * (self.global_best[:, None, :] - self.positions)
+        )
+        self.positions += self.velocities
+        self.unclamped = self.positions.copy()
+
+        self.positions[..., 1] = np.trunc(self.positions[..., 1])
+        np.clip(self.positions, self.lower, self.upper, out=self.positions)
+
+    def init_bests(self, fitness):
+        """Record the initial placement as every particle's personal best."""
+        self.local_bests = self.positions.copy()
+        self.local_best_fitness = fitness.copy()
+        swarms = np.arange(len(self))
+        best = np.argmax(fitness, axis=1)
+        self.global_best = self.positions[swarms, best].copy()
+        self.global_best_fitness = fitness[swarms, best]
+
+    def update_bests(self, fitness):
+        """
+        Update personal and global bests from a ``(swarms, particles)`` batch
+        of fitness values.
+
+        Returns ``(new_local, new_global)`` boolean masks. Particles are taken in
+        order, so a particle only counts as a new global best (and earns a
+        contribution) if it beats every earlier particle of its swarm this
+        iteration too.
+        """
+        new_local = fitness > self.local_best_fitness
+        self.local_bests[new_local] = self.positions[new_local]
+        self.local_best_fitness[new_local] = fitness[new_local]
+
+        best_before = np.maximum.accumulate(
+            np.concatenate([self.global_best_fitness[:, None], fitness[:, :-1]], axis=1), axis=1
+        )
+        new_global = fitness > best_before
+        improved = np.flatnonzero(new_global.any(axis=1))
+        best = np.argmax(fitness[improved], axis=1)
+        self.global_best[improved] = self.positions[improved, best]
+        self.global_best_fitness[improved] = fitness[improved, best]
+        self.contributions += new_global
+        return new_local, new_global
+
+    def diversity(self):
+        """Normalized spread of every swarm, shape ``(swarms,)``."""
+        return diversity(self.positions, self.lower, self.upper)
+
+    def keep(self, mask):
+        """Drop the swarms not selected by the boolean ``mask`` (e.g. ones that have converged)."""
+        self.manufacturers = [m for m, kept in zip(self.manufacturers, mask) if kept]
+        self.constraints = {key: column[mask] for key, column in self.constraints.items()}
+        for name in ("rows", "lower", "upper", "positions", "velocities", "unclamped", "local_bests",
+                     "local_best_fitness", "global_best", "global_best_fitness", "contributions"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def best_offer(self, k):
+        return {
+            "price": round(float(self.global_best[k, 0]), 2),
+            "delivery": int(self.global_best[k, 1]),
+            "quality": REVERSE_QUALITY_MAP.get(round(float(self.global_best[k, 2]), 1), "Standard")
         }
-        structured_logs.append(m_log)
-        
-        num_particles = m_log["num_particles"]
-        swarm, velocities = [], []
-        local_bests, local_best_fitness = [], []
-        contributions = [0] * num_particles
-
-        # Global best initialization
-        global_best = None
-        global_best_fitness = -float('inf')
-
-        # Log initialization
-        full_logs.append({
-            "stage": "init",
-            "manufacturer_id": m["id"],
-            "num_particles": num_particles,
-            **m_log
-        })
-
-        # Particle initialization
-        for i in range(num_particles):
-            q_val = QUALITY_MAP[random.choice(m['qualities'])]
-            particle = {
-                "price": random.uniform(m['minPrice'], m['initialOffer']['price']),
-                "delivery": random.randint(m['minDelivery'], m['initialOffer']['delivery']),
-                "quality": q_val
-            }
-            velocity = {
-                "price": random.uniform(-1, 1),
-                "delivery": random.uniform(-1, 1),
-                "quality": random.uniform(-0.2, 0.2)
-            }
-
-            # Convert to offer format for fitness evaluation
-            offer = {
-                "price": particle["price"],
-                "delivery": particle["delivery"],
-                "quality": REVERSE_QUALITY_MAP.get(round(particle["quality"], 1), "Standard")
-            }
 
-            fitness = negotiation_fitness(offer, user, m, weights)
 
-            # Store initialization logs
-            particle_log = {
-                "stage": "init_particle",
-                "manufacturer_id": m["id"],
-                "particle_id": i,
-                "particle": particle.copy(),
-                "velocity": velocity.copy(),
-                "fitness": fitness
-            }
-            full_logs.append(particle_log)
-            m_log["particles_init"] = m_log.get("particles_init", []) + [particle_log]
-
-            # Update bests
-            swarm.append(particle)
-            velocities.append(velocity)
-            local_bests.append(particle.copy())
-            local_best_fitness.append(fitness)
-
-            if fitness > global_best_fitness:
-                global_best = particle.copy()
-                global_best_fitness = fitness
-
-        # Optimization loop
-        for iter_num in range(max_iters):
-            iter_log = {"iteration": iter_num + 1, "particles": []}
-            m_log["iterations"].append(iter_log)
-
-            for i, particle in enumerate(swarm):
-                update_log = {"particle_id": i, "updates": {}, "fitness_eval": {}}
-                iter_log["particles"].append(update_log)
-                
-                # Dynamic social factor
-                social_factor = BASE_SOCIAL + (contributions[i] / (iter_num + 1))
-
-                # Update each dimension
-                for dim in ["price", "delivery", "quality"]:
-                    r1, r2 = random.random(), random.random()
-                    vel_update = (
-                        INERTIA * velocities[i][dim] +
-                        COGNITIVE * r1 * (local_bests[i][dim] - particle[dim]) +
-                        social_factor * r2 * (global_best[dim] - particle[dim])
-                    )
-                    
-                    # Apply updates
-                    particle[dim] += vel_update
-                    velocities[i][dim] = vel_update
-
-                    # Dimension-specific logging
-                    dim_log = {
-                        "stage": "velocity_update",
-                        "manufacturer_id": m["id"],
-                        "iteration": iter_num + 1,
-                        "particle_id": i,
-                        "dimension": dim,
-                        "new_value": particle[dim],
-                        "velocity": vel_update
-                    }
-                    full_logs.append(dim_log)
-                    update_log["updates"][dim] = dim_log.copy()
-
-                # Apply constraints
-                particle["price"] = max(m["minPrice"], min(particle["price"], m["initialOffer"]["price"]))
-                particle["delivery"] = max(m["minDelivery"], min(int(particle["delivery"]), m["initialOffer"]["delivery"]))
-                particle["quality"] = max(0.3, min(particle["quality"], 1.0))
-
-                # Prepare offer for fitness evaluation
-                quality_label = REVERSE_QUALITY_MAP.get(round(particle["quality"], 1), "Standard")
-                offer = {
-                    "price": particle["price"],
-                    "delivery": int(particle["delivery"]),
-                    "quality": quality_label
-                }
-
-                # Evaluate fitness
-                fitness = negotiation_fitness(offer, user, m, weights)
-                is_local_best = False
-                is_global_best = False
-
-                # Update bests
-                if fitness > local_best_fitness[i]:
-                    local_bests[i] = particle.copy()
-                    local_best_fitness[i] = fitness
-                    is_local_best = True
-
-                if fitness > global_best_fitness:
-                    global_best = particle.copy()
-                    global_best_fitness = fitness
-                    contributions[i] += 1
-                    is_global_best = True
-
-                # Fitness evaluation logging
-                fitness_log = {
-                    "offer": offer,
-                    "fitness": fitness,
-                    "is_new_local_best": is_local_best,
-                    "is_new_global_best": is_global_best,
-                    "contribution_score": contributions[i]
-                }
-                update_log["fitness_eval"] = fitness_log
-                full_logs.append({
-                    "stage": "fitness_eval",
-                    "manufacturer_id": m["id"],
-                    "iteration": iter_num + 1,
-                    "particle_id": i,
-                    **fitness_log
-                })
-
-        # Final best offer conversion
-        quality_label = REVERSE_QUALITY_MAP.get(round(global_best["quality"], 1), "Standard")
-        best_offer = {
-            "price": round(global_best["price"], 2),
-            "delivery": int(global_best["delivery"]),
-            "quality": quality_label
+class Trace:
+    """
+    Columnar round history for a stack of swarms.
+
+    Every level keeps one preallocated array per recorded quantity, indexed by
+    ``(iteration, swarm)`` (iteration 0 is the initial swarm); "full" adds
+    ``(iteration, swarm, particle, dim)`` arrays instead of per-particle dicts.
+    """
+
+    def __init__(self, level, max_iters, num_swarms, num_particles):
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"unknown trace level {level!r}, expected one of {TRACE_LEVELS}")
+        self.level = level
+        self.rows = 0
+        if level == "none":
+            return
+        rows = (max_iters + 1, num_swarms)
+        self.best_fitness = np.empty(rows)
+        if level in ("summary", "full"):
+            self.mean_fitness = np.empty(rows)
+            self.diversity = np.empty(rows)
+            self.new_global_bests = np.empty(rows, dtype=int)
+        if level == "full":
+            shape = rows + (num_particles,)
+            self.positions = np.empty(shape + (len(DIMS),))  # before clamping
+            self.velocities = np.empty(shape + (len(DIMS),))
+            self.fitness = np.empty(shape)
+            self.new_local = np.empty(shape, dtype=bool)
+            self.new_global = np.empty(shape, dtype=bool)
+            self.contributions = np.empty(shape, dtype=int)
+
+    def record(self, swarm, fitness, new_local, new_global, spread):
+        """Record one iteration of every swarm still in ``swarm``."""
+        if self.level == "none":
+            return
+        t, rows = self.rows, swarm.rows
+        self.rows += 1
+        self.best_fitness[t, rows] = swarm.global_best_fitness
+        if self.level == "curve":
+            return
+        self.mean_fitness[t, rows] = fitness.mean(axis=1)
+        self.diversity[t, rows] = spread
+        self.new_global_bests[t, rows] = new_global.sum(axis=1)
+        if self.level == "full":
+            self.positions[t, rows] = swarm.unclamped
+            self.velocities[t, rows] = swarm.velocities
+            self.fitness[t, rows] = fitness
+            self.new_local[t, rows] = new_local
+            self.new_global[t, rows] = new_global
+            self.contributions[t, rows] = swarm.contributions
+
+    def history(self, row, n):
+        """The roundHistory metadata of swarm ``row``'s first ``n`` iterations (None for "none")."""
+        if self.level == "none":
+            return None
+        if self.level == "curve":
+            return {"best_fitness": self.best_fitness[:n, row].round(6).tolist()}
+        return {
+            "iteration": list(range(n)),
+            "best_fitness": self.best_fitness[:n, row].round(6).tolist(),
+            "mean_fitness": self.mean_fitness[:n, row].round(6).tolist(),
+            "diversity": self.diversity[:n, row].round(6).tolist(),
+            "new_global_bests": self.new_global_bests[:n, row].tolist(),
         }
 
-        # Store manufacturer results
-        result_log = {
-            "stage": "result",
-            "manufacturer_id": m["id"],
-            "best_offer": best_offer,
-            "fitness": global_best_fitness,
-            "contributions": contributions
-        }
-        full_logs.append(result_log)
-
-        best_offers.append({
-            'manufacturerID': m['id'],
-            'optimizedOffer': best_offer,
-            'fitness': round(global_best_fitness, 4),
-            'metadata': {
-                'contributions': contributions,
-                'roundHistory': m_log["iterations"]
+    def save(self, path, swarm, k, n):
+        """Write swarm ``k``'s full trace as compressed arrays (``np.load(path)`` reads it back)."""
+        row = swarm.rows[k]
+        np.savez_compressed(
+            path,
+            manufacturer_id=swarm.manufacturers[k]["id"],
+            dims=np.array(DIMS),
+            lower=swarm.lower[k, 0],
+            upper=swarm.upper[k, 0],
+            best_fitness=self.best_fitness[:n, row],
+            mean_fitness=self.mean_fitness[:n, row],
+            diversity=self.diversity[:n, row],
+            positions=self.positions[:n, row],
+            velocities=self.velocities[:n, row],
+            fitness=self.fitness[:n, row],
+            new_local=self.new_local[:n, row],
+            new_global=self.new_global[:n, row],
+            contributions=self.contributions[:n, row],
+        )
+
+
+def _run_swarms(user, manufacturers, weights, num_particles, rng, max_iters, convergence, deadline_ms,
+                max_evaluations, trace_level, warm_start):
+    """
+    Optimize a stack of swarms (one per manufacturer) in lockstep; returns
+    one result per manufacturer, in order. A swarm that converges leaves the
+    stack, the rest carry on. The stack shares one clock, and every swarm
+    has its own evaluation budget.
+    """
+    swarm = Swarm(manufacturers, num_particles, rng)
+    warm = [(warm_start or {}).get(m['id']) for m in manufacturers]
+    seeded = [swarm.seed(k, w["elites"]) if w else 0 for k, w in enumerate(warm)]
+    targets = [w["target_fitness"] if w and w["target_fitness"] is not None else np.nan for w in warm]
+    monitor = BatchConvergenceMonitor(convergence, max_iters, len(swarm), targets)
+    # Swarms advance together, so one counter holds every active swarm's evaluations.
+    budget = Budget(deadline_ms, max_evaluations)
+    history = Trace(trace_level, max_iters, len(swarm), num_particles)
+    results = [None] * len(manufacturers)
+
+    def finish(done):
+        for k in np.flatnonzero(done):
+            row = swarm.rows[k]
+            m = swarm.manufacturers[k]
+            report = monitor.report(row)
+            rows = report["iterations_used"] + 1
+            metadata = {
+                'num_particles': num_particles,
+                'contributions': swarm.contributions[k].tolist(),
+                'max_iters': max_iters,
+                **report,
+                'budget': {**budget.report(), 'evaluations_used': rows * num_particles},
+                'trace': trace_level,
             }
-        })
-
-    # Save logs
-    os.makedirs("outputs", exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Save flat logs
-    with open(f"outputs/full_logs_{timestamp}.json", "w") as f:
-        json.dump(full_logs, f, indent=4)
-    
-    # Save structured logs
-    with open(f"outputs/structured_logs_{timestamp}.json", "w") as f:
-        json.dump(structured_logs, f, indent=4)
-    
-    # Save results
-    with open(f"outputs/results_{timestamp}.json", "w") as f:
-        json.dump(best_offers, f, indent=4)
+            if len(manufacturers) > 1:
+                metadata['batched_swarms'] = len(manufacturers)
+            if warm[row]:
+                metadata['elites_seeded'] = seeded[row]
+            if trace_level != "none":
+                metadata['roundHistory'] = history.history(row, rows)
+            if trace_level == "full":
+                os.makedirs(TRACE_DIR, exist_ok=True)
+                stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                path = os.path.join(TRACE_DIR, f"mpso_trace_{m['id']}_{stamp}_{os.getpid()}.npz")
+                history.save(path, swarm, k, rows)
+                metadata['trace_file'] = path
+                log.info("mpso.trace_saved", manufacturer_id=m["id"], path=path)
+
+            results[row] = {
+                'manufacturerID': m['id'],
+                'optimizedOffer': swarm.best_offer(k),
+                'fitness': round(float(swarm.global_best_fitness[k]), 4),
+                'metadata': metadata
+            }
+        swarm.keep(~done)
+
+    # Particle initialization
+    fitness = swarm.evaluate(user, weights)
+    budget.charge(num_particles)
+    swarm.init_bests(fitness)
+    monitor.start(swarm.global_best_fitness)
+    initial_global = np.zeros(fitness.shape, dtype=bool)
+    initial_global[np.arange(len(swarm)), np.argmax(fitness, axis=1)] = True
+    history.record(swarm, fitness, np.ones(fitness.shape, dtype=bool), initial_global, swarm.diversity())
+
+    # Optimization loop
+    for iter_num in range(max_iters):
+        if not budget.allows(num_particles):
+            monitor.stop_reason[swarm.rows] = budget.exhausted_by
+            break
+        swarm.step(iter_num)
+        fitness = swarm.evaluate(user, weights)
+        budget.charge(num_particles)
+        new_local, new_global = swarm.update_bests(fitness)
+
+        spread = swarm.diversity()
+        history.record(swarm, fitness, new_local, new_global, spread)
+        if log.enabled(logging.DEBUG):
+            for k, m in enumerate(swarm.manufacturers):
+                log.debug("mpso.iteration", manufacturer_id=m["id"], iteration=iter_num + 1,
+                          best_fitness=float(swarm.global_best_fitness[k]), diversity=float(spread[k]))
+        else:
+            log.suppress(len(swarm))
+        stopped = monitor.update(swarm.global_best_fitness, spread, swarm.rows)
+        if stopped.any():
+            finish(stopped)
+            if not len(swarm):
+                break
+
+    finish(np.ones(len(swarm), dtype=bool))
+    return results
+
+
+def run_mpso(user, manufacturers, weights, max_iters=50, num_particles=None, seed=None, convergence=None,
+             deadline_ms=None, max_evaluations=None, trace=None, warm_start=None, batched=None):
+    """
+    Contribution-weighted multi-agent PSO, one swarm per manufacturer.
+
+    ``deadline_ms`` and ``max_evaluations`` cap each manufacturer's run; when
+    either is reached the swarm stops and reports its best-so-far. ``trace``
+    is one of TRACE_LEVELS (default: DEALHIVE_MPSO_TRACE) and decides what
+    ``metadata.roundHistory`` holds. ``warm_start`` maps manufacturer ids to
+    ``{"elites", "target_fitness"}`` (see warm_start.engine_warm_start): the
+    elites seed that manufacturer's swarm.
+
+    By default the swarms run one after another, each with its own particle
+    count. ``batched`` (default: DEALHIVE_MPSO_BATCHED) stacks them into one
+    ``(manufacturers, particles, 3)`` array and advances them all in the same
+    vector operations. They then share one particle count (``num_particles``,
+    or one random draw) and one deadline.
+    """
+    rng = np.random.default_rng(seed)
+    convergence = ConvergenceCriteria.coerce(convergence)
+    trace_level = trace or TRACE_LEVEL
+    batched = BATCHED if batched is None else batched
+    limits = (max_iters, convergence, deadline_ms, max_evaluations, trace_level, warm_start)
 
-    print(f"\n📝 Logs saved to: outputs/full_logs_{timestamp}.json")
-    print(f"📝 Structured logs saved to: outputs/structured_logs_{timestamp}.json")
-    print(f"📁 Results saved to: outputs/results_{timestamp}.json")
+    best_offers = []
+    if batched and manufacturers:
+        best_offers = _run_swarms(user, manufacturers, weights, num_particles or int(rng.integers(5, MAX_PARTICLES + 1)), rng, *limits)
+    elif not batched:
+        for m in manufacturers:
+            best_offers += _run_swarms(user, [m], weights, num_particles or int(rng.integers(5, MAX_PARTICLES + 1)), rng, *limits)
+
+    RESULT_LOG.summary("mpso_results.json", {
+        "timestamp": datetime.utcnow().isoformat(),
+        "results": [{**r, "metadata": {k: v for k, v in r["metadata"].items() if k != "roundHistory"}}
+                    for r in best_offers]
+    })
 
     # Sort by fitness
     best_offers.sort(key=lambda x: x['fitness'], reverse=True)
     return best_offers
 
 
-def run_mpso_one_manufacturer(user, manufacturer, weights, max_iters=50):
+def run_mpso_one_manufacturer(user, manufacturer, weights, max_iters=50, **kwargs):
     """Wrapper to run PSO for a single manufacturer"""
-    results = run_mpso(user, [manufacturer], weights, max_iters)
+    results = run_mpso(user, [manufacturer], weights, max_iters, **kwargs)
     if results:
         return results[0]
     return None
@@ -0,0 +1,160 @@
+# services/quality_indicators.py
+"""
+Batched Pareto quality indicators: GD, IGD, IGD+, spacing and spread.
+
+Every indicator takes either one point set ``(n, d)`` and returns a float,
+or a stack of groups ``(G, n, d)`` (e.g. one group per manufacturer, padded
+with ``pack``) plus validity masks and returns a ``(G,)`` array. Pairwise
+distances are computed by broadcasting, a chunk of groups at a time, so no
+Python loop runs per point pair.
+"""
+
+import numpy as np
+
+# Upper bound on the size of one broadcast (groups x points x targets x dims).
+CHUNK_ELEMENTS = 1 << 22
+
+
+def pack(groups, dims=2):
+    """Stack ragged point sets into a ``(G, N, dims)`` array and a ``(G, N)`` validity mask."""
+    sizes = [len(g) for g in groups]
+    width = max(sizes, default=0)
+    points = np.zeros((len(groups), width, dims))
+    mask = np.zeros((len(groups), width), dtype=bool)
+    for i, group in enumerate(groups):
+        if sizes[i]:
+            points[i, :sizes[i]] = np.asarray(group, dtype=float).reshape(-1, dims)
+            mask[i, :sizes[i]] = True
+    return points, mask
+
+
+def _batch(points, mask=None):
+    """Return ``(points, mask, single)`` with a leading group axis added if needed."""
+    points = np.asarray(points, dtype=float)
+    single = points.ndim == 2
+    if single:
+        points = points[None]
+        mask = None if mask is None else np.asarray(mask, dtype=bool)[None]
+    if mask is None:
+        mask = np.ones(points.shape[:2], dtype=bool)
+    return points, np.asarray(mask, dtype=bool), single
+
+
+def _result(values, single):
+    return float(values[0]) if single else values
+
+
+def nearest_distances(points, points_mask, targets, targets_mask, plus=None):
+    """
+    ``(G, N)`` distance from every point to its nearest valid target in the
+    same group (inf if the group has no targets).
+
+    ``plus`` switches to the one-sided distance used by IGD+: ``"max"`` only
+    counts components where the target exceeds the point, ``"min"`` only
+    those where it falls below.
+    """
+    groups, n, dims = points.shape
+    m = targets.shape[1]
+    out = np.full((groups, n), np.inf)
+    if n == 0 or m == 0:
+        return out
+    step = max(1, CHUNK_ELEMENTS // max(1, n * m * dims))
+    for start in range(0, groups, step):
+        chunk = slice(start, start + step)
+        diff = targets[chunk, None, :, :] - points[chunk, :, None, :]  # (g, n, m, d)
+        if plus == "max":
+            np.maximum(diff, 0.0, out=diff)
+        elif plus == "min":
+            diff = np.maximum(-diff, 0.0)
+        dist = np.sqrt(np.einsum("gnmd,gnmd->gnm", diff, diff))
+        out[chunk] = np.where(targets_mask[chunk, None, :], dist, np.inf).min(axis=2)
+    return out
+
+
+def _masked_mean(values, mask):
+    counts = mask.sum(axis=1)
+    totals = np.where(mask, values, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def gd(solutions, reference, solutions_mask=None, reference_mask=None):
+    """Generational Distance: mean distance from each solution to the nearest reference point (lower = better)."""
+    sol, sol_mask, single = _batch(solutions, solutions_mask)
+    ref, ref_mask, _ = _batch(reference, reference_mask)
+    return _result(_masked_mean(nearest_distances(sol, sol_mask, ref, ref_mask), sol_mask), single)
+
+
+def igd(solutions, reference, solutions_mask=None, reference_mask=None):
+    """Inverted Generational Distance: mean distance from each reference point to the nearest solution (lower = better)."""
+    sol, sol_mask, single = _batch(solutions, solutions_mask)
+    ref, ref_mask, _ = _batch(reference, reference_mask)
+    return _result(_masked_mean(nearest_distances(ref, ref_mask, sol, sol_mask), ref_mask), single)
+
+
+def igd_plus(solutions, reference, solutions_mask=None, reference_mask=None, maximize=True):
+    """
+    IGD+ (Ishibuchi et al.): IGD with the dominance-aware distance, so a
+    solution is never penalised for beating a reference point (lower = better).
+    """
+    sol, sol_mask, single = _batch(solutions, solutions_mask)
+    ref, ref_mask, _ = _batch(reference, reference_mask)
+    # Distance from reference point z to solution a counts only where z beats a.
+    dist = nearest_distances(ref, ref_mask, sol, sol_mask, plus="min" if maximize else "max")
+    return _result(_masked_mean(dist, ref_mask), single)
+
+
+def spacing(solutions, solutions_mask=None):
+    """
+    Schott's spacing: standard deviation of each solution's L1 distance to its
+    nearest neighbour in the same set (0 = evenly spaced; 0 for < 2 points).
+    """
+    sol, mask, single = _batch(solutions, solutions_mask)
+    diff = np.abs(sol[:, :, None, :] - sol[:, None, :, :]).sum(axis=3)  # (G, N, N)
+    n = sol.shape[1]
+    invalid = ~(mask[:, :, None] & mask[:, None, :]) | np.eye(n, dtype=bool)[None]
+    diff[invalid] = np.inf
+    nearest = diff.min(axis=2)
+
+    counts = mask.sum(axis=1)
+    valid = mask & np.isfinite(nearest)
+    mean = _masked_mean(nearest, valid)
+    squares = np.where(valid, (nearest - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(counts > 1, np.sqrt(squares / np.maximum(counts - 1, 1)), 0.0)
+    return _result(values, single)
+
+
+def spread(solutions, reference, solutions_mask=None, reference_mask=None):
+    """
+    Deb's spread (Delta) for 2-D fronts: uniformity of consecutive gaps along
+    the first objective plus distance to the reference front's extremes
+    (0 = perfectly even and reaching both ends).
+    """
+    sol, sol_mask, single = _batch(solutions, solutions_mask)
+    ref, ref_mask, _ = _batch(reference, reference_mask)
+    rows = np.arange(len(sol))
+
+    # Sort each group by the first objective, padding last.
+    order = np.argsort(np.where(sol_mask, sol[:, :, 0], np.inf), axis=1, kind="stable")
+    ordered = np.take_along_axis(sol, order[:, :, None], axis=1)
+    counts = sol_mask.sum(axis=1)
+
+    gaps = np.linalg.norm(np.diff(ordered, axis=1), axis=2)  # (G, N-1)
+    gap_mask = np.arange(gaps.shape[1])[None] < (counts - 1)[:, None]
+    mean_gap = np.where(counts > 1, _masked_mean(gaps, gap_mask), 0.0)
+    deviation = np.where(gap_mask, np.abs(gaps - mean_gap[:, None]), 0.0).sum(axis=1)
+
+    first_ref = ref[rows, np.argmin(np.where(ref_mask, ref[:, :, 0], np.inf), axis=1)]
+    last_ref = ref[rows, np.argmax(np.where(ref_mask, ref[:, :, 0], -np.inf), axis=1)]
+    first_sol = ordered[:, 0]
+    last_sol = ordered[rows, np.maximum(counts - 1, 0)]
+    d_first = np.linalg.norm(first_ref - first_sol, axis=1)
+    d_last = np.linalg.norm(last_ref - last_sol, axis=1)
+
+    numerator = d_first + d_last + deviation
+    denominator = d_first + d_last + np.maximum(counts - 1, 0) * mean_gap
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1.0), 0.0)
+    values = np.where((counts > 0) & ref_mask.any(axis=1), values, np.nan)
+    return _result(values, single)
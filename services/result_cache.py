@@ -0,0 +1,204 @@
+# services/result_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from algorithm_runner import DEFAULT_CONVERGENCE, ENGINE_CONFIG, ENGINE_VERSION
+from engine_log import get_engine_logger
+
+log = get_engine_logger("result_cache")
+
+
+def canonical_hash(payload):
+    """sha256 of ``payload`` as canonical JSON (sorted keys, no whitespace)."""
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def canonical_key(user, manufacturer, weights, options):
+    """
+    Hash of one manufacturer's negotiation inputs together with the engine
+    configuration, so equal inputs always share a key and any config change
+    starts a fresh one.
+    """
+    options = {key: value for key, value in (options or {}).items() if value is not None}
+    # Only this manufacturer's warm-start elites affect its result.
+    elites = options.pop("warm_start", {}).get(manufacturer["id"])
+    if elites:
+        options["warm_start"] = elites
+    return canonical_hash({
+        "user": user,
+        "manufacturer": manufacturer,
+        "weights": weights,
+        "options": options,
+        "engines": ENGINE_CONFIG,
+        "convergence": DEFAULT_CONVERGENCE,
+        "version": ENGINE_VERSION,
+    })
+
+
+class ResultCache:
+    """
+    Per-manufacturer comparison results across requests: an in-memory LRU
+    with a TTL, optionally backed by a SQLite file that survives restarts
+    (entries found there are promoted back into memory). Expired rows are
+    deleted from the file when it is opened and then every ``prune_every``
+    writes, not on every write.
+
+    Cached results are shared between requests; callers must not mutate them.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0, path=None, prune_every=100):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self.prune_every = max(1, prune_every)
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL, result TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_expires_at ON results (expires_at)")
+            self._prune()
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.environ.get("DEALHIVE_RESULT_CACHE_SIZE", 1024)),
+            ttl=float(os.environ.get("DEALHIVE_RESULT_CACHE_TTL", 3600)),
+            path=os.environ.get("DEALHIVE_RESULT_CACHE_DB") or None,
+            prune_every=int(os.environ.get("DEALHIVE_RESULT_CACHE_PRUNE_EVERY", 100)),
+        )
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 or self._db is not None
+
+    def get(self, key):
+        """The cached result for ``key``, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, result FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] > now:
+                    result = json.loads(row[1])
+                    self._remember(key, row[0], result)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return result
+
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, result)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, expires_at, result) VALUES (?, ?, ?)",
+                        (key, expires_at, json.dumps(result)),
+                    )
+                    self._writes += 1
+                    if self._writes % self.prune_every == 0:
+                        self._prune()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    log.warning("result_cache.disk_write_failed", error=e)
+
+    def _prune(self):
+        """Delete expired rows from the SQLite file (callers hold the lock and commit)."""
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def _remember(self, key, expires_at, result):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "disk": self.path,
+        }
+
+    def iter_compare(self, compare, user, manufacturers, weights, options=None, read=True):
+        """
+        Yield ``(index, result, cached)`` per manufacturer: cache hits first,
+        then the misses as ``compare`` (e.g. ``POOL.iter_compare``) finishes
+        them, storing each fresh result. ``read=False`` skips lookups but
+        still stores.
+        """
+        if not self.enabled:
+            for index, result in compare(user, manufacturers, weights, options):
+                yield index, result, False
+            return
+
+        keys = [canonical_key(user, m, weights, options) for m in manufacturers]
+        missing = []
+        for index, key in enumerate(keys):
+            result = self.get(key) if read else None
+            if result is None:
+                missing.append(index)
+            else:
+                yield index, result, True
+
+        if missing:
+            for position, result in compare(user, [manufacturers[i] for i in missing], weights, options):
+                index = missing[position]
+                self.put(keys[index], result)
+                yield index, result, False
+
+
+def cache_status(cached_flags):
+    """X-Cache header value: HIT, MISS or PARTIAL."""
+    if cached_flags and all(cached_flags):
+        return "HIT"
+    return "PARTIAL" if any(cached_flags) else "MISS"
+
+
+RESULT_CACHE = ResultCache.from_env()
@@ -0,0 +1,178 @@
+# services/result_log.py
+
+import atexit
+import contextlib
+import json
+import os
+import random
+import threading
+
+from engine_log import get_engine_logger
+
+LEVELS = ("off", "summary", "sampled", "full")
+
+log = get_engine_logger("result_log")
+
+
+class ResultLog:
+    """
+    Buffered JSON-lines sink for the ``results/`` logs.
+
+    Levels:
+      - off:     nothing is written
+      - summary: only one record per engine run
+      - sampled: run records plus a random ``sample_rate`` share of fitness evaluations
+      - full:    run records plus every fitness evaluation
+
+    Entries are appended to an in-memory buffer and written by a background
+    thread in batches, so callers never touch the filesystem themselves.
+    Entries arriving while the buffer holds ``max_buffer`` are dropped, and
+    so are batches that fail to write; both are counted in ``dropped``.
+
+    A forked child starts with an empty buffer, fresh locks and no writer
+    thread. Pool workers exit without running atexit handlers, so work
+    submitted to them goes through ``flushed`` to write its entries before
+    the task returns. Entries emitted inside ``suppress()`` are discarded.
+    """
+
+    def __init__(self, level="summary", sample_rate=0.01, directory="results",
+                 flush_interval=1.0, batch_size=1000, max_buffer=100000):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.write_errors = 0
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer = []
+        self._writer = None
+        self._local = threading.local()
+        self.configure(level, sample_rate)
+        atexit.register(self.flush)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # The parent's buffer and writer thread are not ours, and its locks may
+        # have been held by another thread at the moment of the fork.
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer = []
+        self._writer = None
+        self._rng.seed()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            level=os.environ.get("DEALHIVE_RESULT_LOG", "summary"),
+            sample_rate=float(os.environ.get("DEALHIVE_RESULT_LOG_SAMPLE_RATE", 0.01)),
+            directory=os.environ.get("DEALHIVE_RESULT_LOG_DIR", "results"),
+            max_buffer=int(os.environ.get("DEALHIVE_RESULT_LOG_MAX_BUFFER", 100000)),
+        )
+
+    def configure(self, level=None, sample_rate=None):
+        if level is not None:
+            if level not in LEVELS:
+                raise ValueError(f"Unknown result log level {level!r}; expected one of {LEVELS}")
+            self.level = level
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        # Plain attributes so the fitness hot path only pays for one lookup.
+        self.summaries = self.level != "off"
+        self.evaluations = self.level in ("sampled", "full")
+
+    def sample(self):
+        """Return True if the next fitness evaluation should be logged."""
+        if not self.evaluations:
+            return False
+        return self.level == "full" or self._rng.random() < self.sample_rate
+
+    def sample_indices(self, n):
+        """Indices of a batch of ``n`` fitness evaluations that should be logged."""
+        if not self.evaluations:
+            return []
+        if self.level == "full":
+            return range(n)
+        return [i for i in range(n) if self._rng.random() < self.sample_rate]
+
+    @contextlib.contextmanager
+    def suppress(self):
+        """Discard every entry this thread emits inside the block (e.g. warm-up runs on fake data)."""
+        previous = getattr(self._local, "suppressed", False)
+        self._local.suppressed = True
+        try:
+            yield
+        finally:
+            self._local.suppressed = previous
+
+    def evaluation(self, filename, entry):
+        if self.evaluations:
+            self._emit(filename, [entry])
+
+    def evaluation_batch(self, filename, entries):
+        if self.evaluations:
+            self._emit(filename, list(entries))
+
+    def summary(self, filename, entry):
+        if self.summaries:
+            self._emit(filename, [entry])
+
+    def _emit(self, filename, entries):
+        if not entries or getattr(self._local, "suppressed", False):
+            return
+        with self._lock:
+            room = self.max_buffer - len(self._buffer)
+            if room < len(entries):
+                self.dropped += len(entries) - max(room, 0)
+                entries = entries[:max(room, 0)]
+            self._buffer.extend((filename, entry) for entry in entries)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="result-log-writer", daemon=True)
+                self._writer.start()
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the writer alive whatever goes wrong; write errors are counted in flush().
+                log.warning("result_log.writer_error", error=e)
+
+    def flush(self):
+        """Write every buffered entry, grouped into one append per file."""
+        with self._lock:
+            pending, self._buffer = self._buffer, []
+        if not pending:
+            return
+        by_file = {}
+        for filename, entry in pending:
+            by_file.setdefault(filename, []).append(entry)
+        for filename, entries in by_file.items():
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, filename), "a") as f:
+                    f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            except (OSError, TypeError, ValueError) as e:
+                with self._lock:
+                    self.write_errors += 1
+                    self.dropped += len(entries)
+                log.warning("result_log.write_failed", file=filename, entries=len(entries), error=e)
+
+
+RESULT_LOG = ResultLog.from_env()
+
+
+def flushed(fn, *args):
+    """Call ``fn(*args)`` and write its result log entries before returning (for pool tasks)."""
+    try:
+        return fn(*args)
+    finally:
+        RESULT_LOG.flush()
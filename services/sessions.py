@@ -0,0 +1,135 @@
+# services/sessions.py
+
+import copy
+import os
+import threading
+import time
+import uuid
+
+from warm_start import elites_from_comparison
+
+# Sessions idle for longer than this (seconds) are dropped.
+SESSION_TTL = float(os.environ.get("DEALHIVE_SESSION_TTL", 3600))
+SESSION_LIMIT = int(os.environ.get("DEALHIVE_SESSION_LIMIT", 1024))
+
+
+class NegotiationSession:
+    """
+    One multi-round negotiation: the current round's inputs (user,
+    manufacturers by id, weights, engine options) and the latest comparison
+    per manufacturer, which also warm-starts that manufacturer's next run.
+    """
+
+    def __init__(self, user, manufacturers, weights, options):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.manufacturers = {m["id"]: m for m in manufacturers}
+        self.weights = weights
+        self.options = options
+        self.results = {}  # manufacturer id -> comparison
+        self.pending = set()  # changed manufacturers whose re-optimization has not finished
+        self.round = 0
+        self.created_at = self.updated_at = time.time()
+        # Rounds of one session run one at a time.
+        self.lock = threading.Lock()
+
+    def update(self, user=None, weights=None, manufacturers=(), remove=()):
+        """
+        Apply a round's changes (full, validated values) and return
+        ``(affected, removed)`` manufacturer ids. A changed user or weights
+        affects every manufacturer; otherwise only manufacturers that were
+        added or whose constraints actually changed are affected.
+        """
+        everyone = (user is not None and user != self.user) or (weights is not None and weights != self.weights)
+        if user is not None:
+            self.user = user
+        if weights is not None:
+            self.weights = weights
+
+        removed = [mid for mid in remove if self.manufacturers.pop(mid, None) is not None]
+        for mid in removed:
+            self.results.pop(mid, None)
+
+        changed = set()
+        for manufacturer in manufacturers:
+            if self.manufacturers.get(manufacturer["id"]) != manufacturer:
+                self.manufacturers[manufacturer["id"]] = manufacturer
+                changed.add(manufacturer["id"])
+
+        self.pending.update(mid for mid in self.manufacturers if everyone or mid in changed or mid not in self.results)
+        self.pending.difference_update(removed)
+        return [mid for mid in self.manufacturers if mid in self.pending], removed
+
+    def stage(self):
+        """A copy to apply a round to; ``commit`` it once the round has succeeded."""
+        staged = copy.copy(self)
+        staged.manufacturers = dict(self.manufacturers)
+        staged.results = dict(self.results)
+        staged.pending = set(self.pending)
+        return staged
+
+    def commit(self, staged):
+        for name in ("user", "weights", "manufacturers", "results", "pending", "round", "updated_at"):
+            setattr(self, name, getattr(staged, name))
+
+    def warm_start(self, manufacturer_ids):
+        """``options["warm_start"]`` seeding each manufacturer from its last result."""
+        return {mid: elites_from_comparison(self.results[mid]) for mid in manufacturer_ids if mid in self.results}
+
+    def record(self, results):
+        for result in results:
+            self.results[result["manufacturer_id"]] = result
+            self.pending.discard(result["manufacturer_id"])
+        self.round += 1
+        self.updated_at = time.time()
+
+    def to_dict(self):
+        return {
+            "session_id": self.id,
+            "round": self.round,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "user": self.user,
+            "weights": self.weights,
+            "manufacturers": list(self.manufacturers.values()),
+        }
+
+
+class SessionStore:
+    """In-memory negotiation sessions (per worker), dropped after ``ttl`` seconds idle."""
+
+    def __init__(self, ttl=SESSION_TTL, limit=SESSION_LIMIT):
+        self.ttl = ttl
+        self.limit = limit
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, user, manufacturers, weights, options):
+        session = NegotiationSession(user, manufacturers, weights, options)
+        with self._lock:
+            self._evict()
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._evict()
+            return self._sessions.get(session_id)
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        expired = [sid for sid, s in self._sessions.items() if s.updated_at < cutoff and not s.lock.locked()]
+        for sid in expired:
+            del self._sessions[sid]
+        # Over the limit: drop the least recently updated sessions.
+        overflow = len(self._sessions) - self.limit
+        if overflow > 0:
+            for sid in sorted(self._sessions, key=lambda sid: self._sessions[sid].updated_at)[:overflow]:
+                del self._sessions[sid]
+
+
+SESSIONS = SessionStore()
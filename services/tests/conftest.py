@@ -0,0 +1,9 @@
+# services/tests/conftest.py
+
+import os
+import sys
+
+# The services modules import each other by plain name, as when run from services/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep test runs from writing result logs.
+os.environ.setdefault("DEALHIVE_RESULT_LOG", "off")
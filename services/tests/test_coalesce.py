@@ -0,0 +1,80 @@
+# services/tests/test_coalesce.py
+
+import asyncio
+import threading
+
+from coalesce import SingleFlight
+
+
+def blocking(release, result=None, error=None):
+    """A fn that waits for ``release`` and then returns ``result`` or raises ``error``; counts its calls."""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, calls
+
+
+def run_three(flight, fn, release):
+    """Three concurrent flight.run("k", fn) calls, all registered before ``release`` is set."""
+
+    async def main():
+        runs = [asyncio.ensure_future(flight.run("k", fn)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 1
+        release.set()
+        return await asyncio.gather(*runs, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_followers_get_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    fn, calls = blocking(release, result={"offer": 1})
+
+    results = run_three(flight, fn, release)
+    assert len(calls) == 1
+    assert [result for result, _ in results] == [{"offer": 1}] * 3
+    assert [coalesced for _, coalesced in results] == [False, True, True]
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 2}
+
+
+def test_leader_exception_reaches_every_follower():
+    flight = SingleFlight()
+    release = threading.Event()
+    fn, calls = blocking(release, error=ValueError("boom"))
+
+    results = run_three(flight, fn, release)
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_key_is_released_so_a_later_call_recomputes():
+    flight = SingleFlight()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return await flight.run("k", fn), await flight.run("k", fn)
+
+    assert asyncio.run(main()) == ((1, False), (2, False))
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "followers": 0}
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(flight.run("a", lambda: "a"), flight.run("b", lambda: "b"))
+
+    assert asyncio.run(main()) == [("a", False), ("b", False)]
@@ -0,0 +1,102 @@
+# services/tests/test_common_fitness.py
+
+import numpy as np
+import pytest
+
+from common_fitness import (QUALITY_MAP, negotiation_fitness, negotiation_fitness_batch,
+                            negotiation_fitness_stacked)
+
+QUALITIES = list(QUALITY_MAP)
+
+
+def random_case(rng):
+    user = {
+        "priceRange": float(rng.integers(500, 2000)),
+        "qualityPreference": str(rng.choice(QUALITIES)),
+        "deliveryTimeline": int(rng.integers(2, 15)),
+    }
+    manufacturer = {
+        "minPrice": float(rng.integers(400, 1500)),
+        "maxQualityCost": float(rng.uniform(0.3, 1.0)),
+        "deliveryCapacity": int(rng.integers(1, 20)),
+    }
+    user_weight = float(rng.uniform())
+    return user, manufacturer, {"user": user_weight, "manufacturer": 1 - user_weight}
+
+
+def random_offers(rng, n):
+    prices = rng.uniform(100, 3000, n)
+    deliveries = rng.integers(1, 30, n).astype(float)
+    qualities = rng.choice([0.3, 0.6, 1.0], n)
+    return prices, deliveries, qualities
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_batch_matches_scalar(seed):
+    rng = np.random.default_rng(seed)
+    user, manufacturer, weights = random_case(rng)
+    prices, deliveries, qualities = random_offers(rng, 50)
+
+    fitness, _, _ = negotiation_fitness_batch(prices, deliveries, qualities, user, manufacturer, weights)
+    expected = [
+        negotiation_fitness({"price": p, "delivery": d, "quality": q}, user, manufacturer, weights)
+        for p, d, q in zip(prices, deliveries, qualities)
+    ]
+    np.testing.assert_allclose(fitness, expected, rtol=0, atol=1e-12)
+
+
+def test_batch_accepts_quality_labels():
+    rng = np.random.default_rng(0)
+    user, manufacturer, weights = random_case(rng)
+    labels = list(rng.choice(QUALITIES, 30))
+    prices, deliveries, _ = random_offers(rng, 30)
+
+    fitness, _, _ = negotiation_fitness_batch(prices, deliveries, labels, user, manufacturer, weights)
+    expected = [
+        negotiation_fitness({"price": p, "delivery": d, "quality": q}, user, manufacturer, weights)
+        for p, d, q in zip(prices, deliveries, labels)
+    ]
+    np.testing.assert_allclose(fitness, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_stacked_matches_batch_per_manufacturer(seed):
+    rng = np.random.default_rng(seed)
+    user, _, weights = random_case(rng)
+    manufacturers = [random_case(rng)[1] for _ in range(4)]
+    prices, deliveries, qualities = (a.reshape(4, 10) for a in random_offers(rng, 40))
+
+    fitness, _, _ = negotiation_fitness_stacked(prices, deliveries, qualities, user, manufacturers, weights)
+    for m, manufacturer in enumerate(manufacturers):
+        expected, _, _ = negotiation_fitness_batch(prices[m], deliveries[m], qualities[m], user, manufacturer, weights)
+        np.testing.assert_allclose(fitness[m], expected, rtol=0, atol=1e-12)
+
+
+USER = {"priceRange": 1000.0, "qualityPreference": "Standard", "deliveryTimeline": 5}
+MANUFACTURER = {"minPrice": 800.0, "maxQualityCost": 0.6, "deliveryCapacity": 5}
+# Far above the user's price and delivery targets; below the manufacturer's minimum price.
+PRICES, DELIVERIES, QUALITIES = np.array([2500.0, 500.0]), np.array([20.0, 5.0]), np.array([0.6, 0.6])
+
+
+def test_scores_are_clamped_at_zero():
+    fitness, user_satisfaction, manufacturer_satisfaction = negotiation_fitness_batch(
+        PRICES, DELIVERIES, QUALITIES, USER, MANUFACTURER, {"user": 0.5, "manufacturer": 0.5})
+    # Offer 0: user price and delivery scores and the manufacturer delivery score bottom out at 0;
+    # the manufacturer price score has no upper clamp. Offer 1: manufacturer price score is 0.
+    np.testing.assert_allclose(user_satisfaction, [1 / 3, 2.5 / 3])
+    np.testing.assert_allclose(manufacturer_satisfaction, [(1700 / 800 + 1) / 3, 2 / 3])
+    expected = [
+        negotiation_fitness({"price": p, "delivery": d, "quality": q}, USER, MANUFACTURER,
+                            {"user": 0.5, "manufacturer": 0.5})
+        for p, d, q in zip(PRICES, DELIVERIES, QUALITIES)
+    ]
+    np.testing.assert_allclose(fitness, expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("weights, side", [({"user": 0.0, "manufacturer": 1.0}, 2),
+                                           ({"user": 1.0, "manufacturer": 0.0}, 1),
+                                           ({"user": 0.0, "manufacturer": 0.0}, None)])
+def test_zero_weights_drop_that_side(weights, side):
+    scores = negotiation_fitness_batch(PRICES, DELIVERIES, QUALITIES, USER, MANUFACTURER, weights)
+    expected = np.zeros(2) if side is None else scores[side]
+    np.testing.assert_allclose(scores[0], expected, rtol=0, atol=1e-12)
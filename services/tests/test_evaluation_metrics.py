@@ -0,0 +1,53 @@
+# services/tests/test_evaluation_metrics.py
+
+import numpy as np
+import pytest
+
+from evaluation_metrics import compute_confusion_metrics
+
+# sklearn warns about zero-division classes; both backends report them as 0.0.
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+LABELS = np.array(["ABC-MNG", "GA-HV", "MPSO", "PSO"])
+# A label that is never predicted, and one that is predicted but never true (zero support).
+NEVER_PREDICTED = (["MPSO", "MPSO", "GA-HV"], ["MPSO", "MPSO", "MPSO"])
+ZERO_SUPPORT = (["MPSO", "MPSO"], ["MPSO", "PSO"])
+
+
+def random_case(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 60))
+    # Fewer labels now and then, so some classes are only predicted or only true.
+    labels = LABELS[:int(rng.integers(1, len(LABELS) + 1))]
+    true_labels = rng.choice(labels, n).tolist()
+    predicted_labels = rng.choice(labels[::-1][:int(rng.integers(1, len(labels) + 1))], n).tolist()
+    return true_labels, predicted_labels
+
+
+def test_label_missing_from_predictions():
+    result = compute_confusion_metrics(*NEVER_PREDICTED, backend="numpy")
+    report = result["classification_report"]
+    assert result["confusion_matrix"] == [[0, 1], [0, 2]]
+    assert report["GA-HV"] == {"precision": 0.0, "recall": 0.0, "f1-score": 0.0, "support": 1.0}
+    assert report["MPSO"] == pytest.approx({"precision": 2 / 3, "recall": 1.0, "f1-score": 0.8, "support": 2.0})
+    assert report["accuracy"] == pytest.approx(2 / 3)
+
+
+def test_zero_support_label():
+    report = compute_confusion_metrics(*ZERO_SUPPORT, backend="numpy")["classification_report"]
+    assert report["PSO"] == {"precision": 0.0, "recall": 0.0, "f1-score": 0.0, "support": 0.0}
+    # Macro averages count the empty class; support-weighted averages ignore it.
+    assert report["macro avg"]["recall"] == pytest.approx(0.25)
+    assert report["weighted avg"]["recall"] == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("case", [NEVER_PREDICTED, ZERO_SUPPORT] + [random_case(seed) for seed in range(5)])
+def test_numpy_backend_matches_sklearn(case):
+    pytest.importorskip("sklearn")
+    true_labels, predicted_labels = case
+    ours = compute_confusion_metrics(true_labels, predicted_labels, backend="numpy")
+    expected = compute_confusion_metrics(true_labels, predicted_labels, backend="sklearn")
+    assert ours["confusion_matrix"] == expected["confusion_matrix"]
+    assert ours["classification_report"].keys() == expected["classification_report"].keys()
+    for key, value in expected["classification_report"].items():
+        assert ours["classification_report"][key] == pytest.approx(value, abs=1e-12)
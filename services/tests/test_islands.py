@@ -0,0 +1,58 @@
+# services/tests/test_islands.py
+
+import pytest
+
+import islands
+from islands import IslandWorkers, run_mpso_islands
+
+USER = {"fabricType": "Cotton", "quantity": 500, "priceRange": 1000, "qualityPreference": "Premium",
+        "deliveryTimeline": 5}
+MANUFACTURER = {"id": 1, "initialOffer": {"price": 1200, "quality": "Standard", "delivery": 10}, "minPrice": 800,
+                "minDelivery": 3, "qualities": ["Economy", "Standard", "Premium"], "maxQualityCost": 0.8,
+                "deliveryCapacity": 9}
+WEIGHTS = {"user": 0.5, "manufacturer": 0.5}
+RUN = {"islands": 4, "migration_interval": 3, "migrants": 2, "topology": "random", "max_iters": 20, "seed": 5}
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    workers = IslandWorkers(processes=3)
+    workers.start()
+    monkeypatch.setattr(islands, "ISLAND_WORKERS", workers)
+    yield workers
+    workers.shutdown()
+
+
+def comparable(result):
+    # Everything but timings and where the islands ran.
+    metadata = {key: value for key, value in result["metadata"].items() if key not in ("budget", "processes")}
+    metadata["islands"] = [{k: v for k, v in island.items() if k != "cpu_time"} for island in metadata["islands"]]
+    return {**result, "metadata": metadata}
+
+
+def test_resident_workers_match_in_process(workers):
+    local = run_mpso_islands(USER, MANUFACTURER, WEIGHTS, processes=False, **RUN)
+    resident = run_mpso_islands(USER, MANUFACTURER, WEIGHTS, **RUN)
+    assert (local["metadata"]["processes"], resident["metadata"]["processes"]) == (False, True)
+    assert comparable(resident) == comparable(local)
+    assert len(workers._idle) == 3
+
+
+def test_lost_worker_reruns_in_process_and_is_replaced(workers):
+    expected = comparable(run_mpso_islands(USER, MANUFACTURER, WEIGHTS, processes=False, **RUN))
+    process, _ = workers._idle[0]
+    process.kill()
+    process.join()
+
+    result = run_mpso_islands(USER, MANUFACTURER, WEIGHTS, **RUN)
+    assert result["metadata"]["processes"] is False
+    assert comparable(result) == expected
+    assert all(process.is_alive() for process, _ in workers._idle) and len(workers._idle) == 3
+    assert run_mpso_islands(USER, MANUFACTURER, WEIGHTS, **RUN)["metadata"]["processes"] is True
+
+
+def test_engine_errors_reach_the_caller_and_keep_the_workers(workers):
+    with pytest.raises(KeyError):
+        run_mpso_islands(USER, MANUFACTURER, {"manufacturer": 1.0}, **RUN)
+    assert len(workers._idle) == 3
+    assert run_mpso_islands(USER, MANUFACTURER, WEIGHTS, **RUN)["metadata"]["processes"] is True
@@ -0,0 +1,129 @@
+# services/tests/test_jobs.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import jobs
+from jobs import JobStore
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def store():
+    store = JobStore(workers=1, retention=60)
+    yield store
+    store.shutdown()
+
+
+@pytest.fixture
+def callback_server():
+    """A local callback endpoint; set ``server.status``/``server.delay`` to make it fail or stall."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            server.received.append((self.headers["X-Job-Id"], json.loads(body)))
+            time.sleep(server.delay)
+            self.send_response(server.status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.received, server.status, server.delay = [], 204, 0
+    server.url = f"http://127.0.0.1:{server.server_port}/done"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_job_goes_queued_running_succeeded(store):
+    release = threading.Event()
+    blocker = store.submit("block", release.wait, 5)
+    job = store.submit("compare", lambda x: x * 2, 21)
+
+    wait_for(lambda: blocker.status == "running")
+    assert job.status == "queued" and job.started_at is None
+    release.set()
+    wait_for(lambda: job.done)
+    assert job.status == "succeeded"
+    assert job.result == 42 and job.error is None
+    assert job.created_at <= job.started_at <= job.finished_at
+    assert store.get(job.id) is job
+
+
+def test_failing_job_records_its_error(store):
+    def fail():
+        raise ValueError("no manufacturers")
+
+    job = store.submit("compare", fail)
+    wait_for(lambda: job.done)
+    assert job.status == "failed"
+    assert job.error == "no manufacturers" and job.result is None
+
+
+def test_finished_jobs_are_evicted_after_retention(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(jobs.time, "time", lambda: now[0])
+    old = store.submit("compare", lambda: 1)
+    wait_for(lambda: old.done)
+
+    now[0] += 59
+    store.submit("compare", lambda: 2)
+    assert store.get(old.id) is old
+    now[0] += 2
+    store.submit("compare", lambda: 3)
+    assert store.get(old.id) is None
+
+
+def test_running_jobs_are_never_evicted(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(jobs.time, "time", lambda: now[0])
+    release = threading.Event()
+    running = store.submit("block", release.wait, 5)
+    wait_for(lambda: running.status == "running")
+
+    now[0] += 3600
+    store.submit("compare", lambda: 1)
+    assert store.get(running.id) is running
+    release.set()
+
+
+def test_callback_receives_the_finished_job(store, callback_server):
+    job = store.submit("compare", lambda: {"winner": "MPSO"}, callback_url=callback_server.url)
+    wait_for(lambda: job.callback_status is not None)
+    assert job.callback_status == 204
+    (job_id, body), = callback_server.received
+    assert job_id == job.id
+    assert body["status"] == "succeeded" and body["result"] == {"winner": "MPSO"}
+
+
+def test_failing_callback_is_recorded_not_raised(store, callback_server):
+    callback_server.status = 500
+    job = store.submit("compare", lambda: 1, callback_url=callback_server.url)
+    wait_for(lambda: job.callback_status is not None)
+    assert job.status == "succeeded"
+    assert job.callback_status.startswith("error:") and "500" in job.callback_status
+    assert store.get(job.id).to_dict()["callback_status"] == job.callback_status
+
+
+def test_slow_callback_times_out(store, callback_server, monkeypatch):
+    monkeypatch.setattr(jobs, "CALLBACK_TIMEOUT", 0.1)
+    callback_server.delay = 1
+    job = store.submit("compare", lambda: 1, callback_url=callback_server.url)
+    wait_for(lambda: job.callback_status is not None)
+    assert job.status == "succeeded"
+    assert job.callback_status.startswith("error:") and "timed out" in job.callback_status
@@ -0,0 +1,78 @@
+# services/tests/test_pareto_metrics.py
+
+import numpy as np
+import pytest
+
+from pareto_metrics import calculate_hv_contributions, calculate_hypervolume, get_pareto_front, is_dominated
+
+
+def brute_force_front(points):
+    """Pairwise reference: every point no other point dominates, in input order."""
+    return [p for p in points if not any(is_dominated(p, q) for q in points)]
+
+
+def brute_force_hypervolume(points, ref):
+    """Area of the union of the boxes [x, ref_x] x [y, ref_y], strip by strip (minimization)."""
+    xs = sorted({x for x, _ in points} | {ref[0]})
+    area = 0.0
+    for left, right in zip(xs, xs[1:]):
+        covering = [y for x, y in points if x <= left]
+        if covering:
+            area += (right - left) * (ref[1] - min(covering))
+    return area
+
+
+def random_points(rng, n):
+    # Integer coordinates half the time, so ties and duplicates are common.
+    if rng.random() < 0.5:
+        return rng.integers(0, 10, (n, 2)).astype(float).tolist()
+    return rng.uniform(0, 10, (n, 2)).tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_front_matches_pairwise(seed):
+    rng = np.random.default_rng(seed)
+    points = random_points(rng, int(rng.integers(1, 40)))
+    assert get_pareto_front(points) == brute_force_front(points)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_hypervolume_and_contributions_match_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    points = random_points(rng, int(rng.integers(1, 25)))
+    ref = [10.5, 10.5]
+
+    total = brute_force_hypervolume(points, ref)
+    assert calculate_hypervolume(points, ref) == pytest.approx(total, abs=1e-9)
+
+    expected = [total - brute_force_hypervolume(points[:i] + points[i + 1:], ref) for i in range(len(points))]
+    np.testing.assert_allclose(calculate_hv_contributions(points, ref), expected, atol=1e-6)
+
+
+def test_duplicate_points():
+    points = [[2.0, 3.0], [2.0, 3.0], [1.0, 1.0]]
+    # Maximization: both copies of the best point stay on the front.
+    assert get_pareto_front(points) == [[2.0, 3.0], [2.0, 3.0]]
+    # Minimization: a copy adds no area, so removing either copy loses nothing.
+    hv = calculate_hypervolume(points, [4.0, 4.0])
+    assert hv == pytest.approx(calculate_hypervolume([[2.0, 3.0], [1.0, 1.0]], [4.0, 4.0]))
+    assert calculate_hv_contributions([[2.0, 2.0], [2.0, 2.0]], [4.0, 4.0]) == [0.0, 0.0]
+
+
+def test_single_point():
+    assert get_pareto_front([[1.0, 2.0]]) == [[1.0, 2.0]]
+    assert calculate_hypervolume([[1.0, 2.0]], [4.0, 4.0]) == pytest.approx(6.0)
+    assert calculate_hv_contributions([[1.0, 2.0]], [4.0, 4.0]) == [6.0]
+
+
+def test_point_on_reference_adds_nothing():
+    assert calculate_hypervolume([[10.0, 1.0]], [10.0, 10.0]) == 0.0
+    assert calculate_hv_contributions([[1.0, 1.0], [10.0, 0.0]], [10.0, 10.0]) == [81.0, 0.0]
+
+
+@pytest.mark.parametrize("point", [[1.0, 11.0], [11.0, 1.0], [11.0, 11.0]])
+def test_point_beyond_reference_is_rejected(point):
+    with pytest.raises(ValueError):
+        calculate_hypervolume([[0.0, 0.0], point], [10.0, 10.0])
+    with pytest.raises(ValueError):
+        calculate_hv_contributions([[0.0, 0.0], point], [10.0, 10.0])
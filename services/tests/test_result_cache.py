@@ -0,0 +1,86 @@
+# services/tests/test_result_cache.py
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+import result_cache
+from result_cache import ResultCache
+
+REQUEST = {
+    "user": {"fabricType": "Cotton", "quantity": 500, "priceRange": 1000, "qualityPreference": "Premium",
+             "deliveryTimeline": 5},
+    "manufacturers": [{"id": 1, "initialOffer": {"price": 1200, "quality": "Standard", "delivery": 10},
+                       "minPrice": 800, "minDelivery": 3, "qualities": ["Economy", "Standard", "Premium"],
+                       "maxQualityCost": 0.8, "deliveryCapacity": 9}],
+    "weights": {"user": 0.5, "manufacturer": 0.5},
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable result_cache.time.time()."""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResultCache(maxsize=4, ttl=10)
+    cache.put("a", {"v": 1})
+    clock[0] += 9.9
+    assert cache.get("a") == {"v": 1}
+    clock[0] += 0.1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_tier_survives_a_new_instance(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    ResultCache(maxsize=4, ttl=10, path=path).put("a", {"v": 1})
+
+    reopened = ResultCache(maxsize=4, ttl=10, path=path)
+    assert reopened.get("a") == {"v": 1}
+    assert reopened.stats()["disk_hits"] == 1
+
+    clock[0] += 10
+    assert ResultCache(maxsize=4, ttl=10, path=path).get("a") is None
+
+
+def test_expired_rows_are_pruned_every_n_writes(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(maxsize=0, ttl=10, path=path, prune_every=3)
+    cache.put("old", 1)
+    clock[0] += 10
+
+    def rows():
+        return sqlite3.connect(path).execute("SELECT key FROM results ORDER BY key").fetchall()
+
+    cache.put("a", 2)
+    assert rows() == [("a",), ("old",)]
+    cache.put("b", 3)
+    assert rows() == [("a",), ("b",)]
+
+
+def test_no_cache_header_recomputes_and_refreshes(monkeypatch):
+    monkeypatch.setattr(app_module, "RESULT_CACHE", ResultCache(maxsize=16, ttl=60))
+    client = TestClient(app_module.app)
+
+    assert client.post("/compare-algorithms", json=REQUEST).headers["X-Cache"] == "MISS"
+    assert client.post("/compare-algorithms", json=REQUEST).headers["X-Cache"] == "HIT"
+    response = client.post("/compare-algorithms", json=REQUEST, headers={"Cache-Control": "no-cache"})
+    assert response.headers["X-Cache"] == "MISS"
+    assert client.post("/compare-algorithms", json=REQUEST).headers["X-Cache"] == "HIT"
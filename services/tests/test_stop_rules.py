@@ -0,0 +1,76 @@
+# services/tests/test_stop_rules.py
+
+import pytest
+
+from algorithm_runner import ENGINE_CONFIG, ENGINES, run_engine
+
+USER = {"fabricType": "Cotton", "quantity": 500, "priceRange": 1000, "qualityPreference": "Premium",
+        "deliveryTimeline": 5}
+MANUFACTURER = {"id": 1, "initialOffer": {"price": 1200, "quality": "Standard", "delivery": 10}, "minPrice": 800,
+                "minDelivery": 3, "qualities": ["Economy", "Standard", "Premium"], "maxQualityCost": 0.8,
+                "deliveryCapacity": 9}
+WEIGHTS = {"user": 0.5, "manufacturer": 0.5}
+MAX_ITERATIONS = {
+    "MPSO": ENGINE_CONFIG["MPSO"]["max_iters"],
+    "ABC-MNG": ENGINE_CONFIG["ABC-MNG"]["max_iter"],
+    "GA-HV": ENGINE_CONFIG["GA-HV"]["generations"],
+}
+# Island-model MPSO goes through the same rules, once per island.
+RUNS = [(name, {}) for name in ENGINES] + [("MPSO", {"islands": {"islands": 2, "migration_interval": 2}})]
+IDS = list(ENGINES) + ["MPSO-islands"]
+
+
+def run(name, extra, **options):
+    return run_engine(name, USER, MANUFACTURER, WEIGHTS, {"seed": 7, **extra, **options})["metadata"]
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_no_improvement(name, extra):
+    metadata = run(name, extra, convergence={"patience": 3, "min_delta": 0.0})
+    assert metadata["stop_reason"] == "no_improvement"
+    assert 3 <= metadata["iterations_used"] < MAX_ITERATIONS[name]
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_below_tolerance(name, extra):
+    # Any gain counts as too small, so the run stops as soon as the window is up.
+    metadata = run(name, extra, convergence={"patience": 3, "min_delta": 1.0})
+    assert metadata["stop_reason"] == "below_tolerance"
+    assert metadata["iterations_used"] == 4
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_diversity_collapse(name, extra):
+    metadata = run(name, extra, convergence={"min_diversity": 0.9})
+    assert metadata["stop_reason"] == "diversity_collapse"
+    assert metadata["iterations_used"] == 1
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_deadline(name, extra):
+    metadata = run(name, extra, convergence=None, deadline_ms=0.001)
+    assert metadata["stop_reason"] == "deadline"
+    assert metadata["iterations_used"] == 0
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_max_evaluations(name, extra):
+    metadata = run(name, extra, convergence=None, max_evaluations=60)
+    assert metadata["stop_reason"] == "max_evaluations"
+    assert metadata["iterations_used"] < MAX_ITERATIONS[name]
+    assert metadata["budget"]["evaluations_used"] <= 60
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_full_budget_without_rules(name, extra):
+    metadata = run(name, extra, convergence=None)
+    assert metadata["stop_reason"] == "max_iterations"
+    assert metadata["iterations_used"] == MAX_ITERATIONS[name]
+
+
+@pytest.mark.parametrize("name, extra", RUNS, ids=IDS)
+def test_same_seed_same_stop(name, extra):
+    first, second = (run(name, extra, convergence={"patience": 3}, max_evaluations=200) for _ in range(2))
+    for key in ("stop_reason", "iterations_used", "best_iteration"):
+        assert first[key] == second[key]
+    assert first["budget"]["evaluations_used"] == second["budget"]["evaluations_used"]
@@ -0,0 +1,154 @@
+# services/warm_start.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common_fitness import QUALITY_MAP
+
+# At most this share of a swarm / hive / population is seeded from elites,
+# so the rest still explores the (possibly changed) search space.
+ELITE_SHARE = 0.5
+
+
+def elite_slots(population_size, elites):
+    """How many individuals of a population of ``population_size`` to seed."""
+    return min(len(elites), max(1, int(population_size * ELITE_SHARE)))
+
+
+def _clamp(value, low, high):
+    return max(low, min(value, high))
+
+
+def engine_offer(elite, bounds):
+    """An elite as an ABC/GA ``[price, delivery, quality %]`` candidate clamped to ``bounds``."""
+    (min_price, max_price), (min_delivery, max_delivery), (min_quality, max_quality) = bounds
+    quality = QUALITY_MAP.get(elite["quality"], QUALITY_MAP["Standard"]) * 100
+    return [
+        round(_clamp(float(elite["price"]), min_price, max_price), 2),
+        int(_clamp(int(elite["delivery"]), min_delivery, max_delivery)),
+        int(_clamp(round(quality), min_quality, max_quality)),
+    ]
+
+
+def elites_from_comparison(comparison):
+    """One elite per engine from a ``build_comparison`` result, best first."""
+    elites = [
+        {
+            **algo["optimizedOffer"],
+            "fitness": algo["fitness"],
+            "engine": name,
+            "best_iteration": algo["metadata"].get("best_iteration"),
+        }
+        for name, algo in comparison["algorithms"].items()
+    ]
+    return sorted(elites, key=lambda e: e["fitness"], reverse=True)
+
+
+def _offer(elite):
+    return elite["price"], elite["delivery"], elite["quality"]
+
+
+def merge_elites(*sources):
+    """Concatenate ``{manufacturer_id: [elite, ...]}`` mappings, earlier sources first."""
+    merged = {}
+    for source in sources:
+        for manufacturer_id, elites in (source or {}).items():
+            merged.setdefault(manufacturer_id, []).extend(elites)
+    return merged
+
+
+def engine_warm_start(elites, engine):
+    """
+    The ``warm_start`` argument for one engine run: the distinct elite offers
+    to seed plus, if one of the elites came from the same engine, its fitness
+    as the target to reach and the iteration at which that engine found it.
+    None without elites.
+    """
+    if not elites:
+        return None
+    distinct = {}
+    for elite in elites:
+        distinct.setdefault(_offer(elite), elite)
+    prior = next((e for e in elites if e.get("engine") == engine and e.get("fitness") is not None), None)
+    return {
+        "elites": list(distinct.values()),
+        "target_fitness": prior["fitness"] if prior else None,
+        "prior_best_iteration": prior.get("best_iteration") if prior else None,
+    }
+
+
+def report(warm, metadata):
+    """
+    The ``metadata.warm_start`` block, built from (and replacing) the seeding
+    keys the engine wrote into ``metadata``.
+
+    ``reached_at`` is the iteration at which this run first matched the
+    prior round's fitness or, if the new bounds put that out of reach
+    (``target_reached`` false), at which it found its own final best.
+    ``iterations_saved`` is the prior round's ``best_iteration`` minus
+    ``reached_at``; None without a prior run of the same engine or when the
+    target was not reached (the two iterations would then be for different
+    fitness levels).
+    """
+    reached_at = metadata.pop("target_reached_at", None)
+    target_reached = reached_at is not None
+    if not target_reached:
+        reached_at = metadata.get("best_iteration")
+    prior = warm["prior_best_iteration"]
+    return {
+        "elites_seeded": metadata.pop("elites_seeded", 0),
+        "target_fitness": warm["target_fitness"],
+        "target_reached": target_reached,
+        "prior_best_iteration": prior,
+        "reached_at": reached_at,
+        "iterations_saved": prior - reached_at if target_reached and prior is not None else None,
+    }
+
+
+class EliteStore:
+    """
+    The latest elites, ``{manufacturer_id: [elite]}``, of every
+    ``warm_start_id`` that /compare-algorithms requests send, kept in memory
+    (per worker) with an idle TTL and an LRU size limit. Separate from the
+    /sessions store (sessions.SESSIONS), which warm-starts its own rounds.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # warm_start_id -> (expires_at, elites)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.environ.get("DEALHIVE_WARM_START_SESSIONS", 1024)),
+            ttl=float(os.environ.get("DEALHIVE_WARM_START_TTL", 3600)),
+        )
+
+    def get(self, warm_start_id):
+        with self._lock:
+            entry = self._entries.get(warm_start_id)
+            if entry is None:
+                return {}
+            if entry[0] <= time.time():
+                del self._entries[warm_start_id]
+                return {}
+            self._entries.move_to_end(warm_start_id)
+            return entry[1]
+
+    def update(self, warm_start_id, comparisons):
+        """Replace the elites of every manufacturer in ``comparisons``; others are kept."""
+        with self._lock:
+            entry = self._entries.pop(warm_start_id, None)
+            elites = dict(entry[1]) if entry else {}
+            for comparison in comparisons:
+                elites[comparison["manufacturer_id"]] = elites_from_comparison(comparison)
+            self._entries[warm_start_id] = (time.time() + self.ttl, elites)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+ELITES = EliteStore.from_env()
@@ -0,0 +1,105 @@
+# services/warmup.py
+
+import importlib
+import sys
+import threading
+import time
+
+from engine_log import get_engine_logger
+
+log = get_engine_logger("startup")
+
+# Tiny workload used to push the engines and metrics through their first call.
+_USER = {'fabricType': 'Cotton', 'quantity': 100, 'priceRange': 1000, 'qualityPreference': 'Standard',
+         'deliveryTimeline': 5}
+_MANUFACTURER = {'id': 0, 'initialOffer': {'price': 1100, 'quality': 'Standard', 'delivery': 8},
+                 'minPrice': 850, 'minDelivery': 3, 'qualities': ['Economy', 'Standard', 'Premium'],
+                 'maxQualityCost': 0.8, 'deliveryCapacity': 7}
+_WEIGHTS = {'user': 0.5, 'manufacturer': 0.5}
+
+
+class Startup:
+    """
+    Startup report for the service: how long imports took (at boot and on
+    first use of lazily imported modules) and which warm-up steps have run.
+    Warm-up steps are idempotent, so /ready can be polled freely.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.warmed = {}
+        self._lock = threading.Lock()
+
+    def mark(self, stage):
+        """Record seconds since this module was imported under ``stage``."""
+        self.imports[stage] = round(time.perf_counter() - self.started, 4)
+        log.info("startup.imported", stage=stage, seconds=self.imports[stage])
+
+    def load(self, module):
+        """Import ``module`` on first use, recording how long the import took."""
+        if module in sys.modules:
+            return sys.modules[module]
+        start = time.perf_counter()
+        loaded = importlib.import_module(module)
+        self.imports.setdefault(module, round(time.perf_counter() - start, 4))
+        log.info("startup.lazy_import", module=module, seconds=self.imports[module])
+        return loaded
+
+    def warm(self, targets):
+        """Run each warm-up step in ``targets`` once; returns the steps' timings."""
+        with self._lock:
+            for target in targets:
+                if target in self.warmed:
+                    continue
+                start = time.perf_counter()
+                WARMERS[target](self)
+                self.warmed[target] = round(time.perf_counter() - start, 4)
+                log.info("startup.warmed", target=target, seconds=self.warmed[target])
+        return {target: self.warmed[target] for target in targets}
+
+    def report(self):
+        return {"imports": dict(self.imports), "warmed": dict(self.warmed)}
+
+
+def _warm_engines(startup):
+    """
+    Run every engine once on the fake manufacturer. The runs bypass the
+    result cache (run_engine never touches it) and write no result logs, so
+    they show up in neither.
+    """
+    from algorithm_runner import ENGINES, run_engine
+    from result_log import RESULT_LOG
+
+    with RESULT_LOG.suppress():
+        for name in ENGINES:
+            run_engine(name, _USER, _MANUFACTURER, _WEIGHTS, {"trace": "none"})
+
+
+def _warm_pool(startup):
+    from worker_pool import POOL
+
+    POOL.start()
+
+
+def _warm_islands(startup):
+    from islands import ISLAND_WORKERS
+
+    ISLAND_WORKERS.start()
+
+
+def _warm_metrics(startup):
+    evaluation_metrics = startup.load("evaluation_metrics")
+    pareto_metrics = startup.load("pareto_metrics")
+    evaluation_metrics.compute_confusion_metrics(["MPSO", "GA-HV"], ["MPSO", "GA-HV"])
+    pareto_metrics.calculate_pareto_metrics_batch([{"MPSO": [[0.8, 0.1]], "GA-HV": [[0.7, 0.05]]}], [1.0, 0.2])
+
+
+WARMERS = {
+    "engines": _warm_engines,
+    "pool": _warm_pool,
+    "islands": _warm_islands,
+    "metrics": _warm_metrics,
+}
+
+STARTUP = Startup()
@@ -0,0 +1,154 @@
+# services/worker_pool.py
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from algorithm_runner import ENGINES, build_comparison, compare_manufacturer, run_engine
+from engine_log import get_engine_logger
+from result_log import flushed
+
+POOL_WORKERS = int(os.environ.get("DEALHIVE_POOL_WORKERS", os.cpu_count() or 1))
+# Below this many manufacturers the IPC/pickling overhead outweighs the gain.
+POOL_MIN_MANUFACTURERS = int(os.environ.get("DEALHIVE_POOL_MIN_MANUFACTURERS", 4))
+# Run MPSO, ABC-MNG and GA-HV side by side for requests below that threshold.
+CONCURRENT_ENGINES = os.environ.get("DEALHIVE_CONCURRENT_ENGINES", "0") == "1"
+# Workers are never forked from the server itself: a fork would copy its
+# threads' locks (logging, result log, job queue) in whatever state they were.
+# The forkserver (or spawn, where there is none) starts them from a clean
+# process that gets the server's sys.path, so the services modules import.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+log = get_engine_logger("pool")
+
+
+def _warm_worker(_):
+    """Touch the fitness path once so the worker's first real task is not a cold start."""
+    from common_fitness import negotiation_fitness_batch
+
+    user = {'priceRange': 1000, 'qualityPreference': 'Standard', 'deliveryTimeline': 5}
+    manufacturer = {'minPrice': 800, 'maxQualityCost': 0.6, 'deliveryCapacity': 5}
+    negotiation_fitness_batch([900.0], [5], [0.6], user, manufacturer, {'user': 0.5, 'manufacturer': 0.5})
+    return os.getpid()
+
+
+class ManufacturerPool:
+    """
+    Persistent process pool that fans /compare-algorithms manufacturers out
+    across cores. Requests smaller than ``min_manufacturers`` (or a pool with
+    fewer than two workers) run in-process instead, unless
+    ``concurrent_engines`` is set, in which case each of their manufacturers
+    runs its three engines in parallel on the pool.
+    """
+
+    def __init__(self, workers=POOL_WORKERS, min_manufacturers=POOL_MIN_MANUFACTURERS,
+                 concurrent_engines=CONCURRENT_ENGINES):
+        self.workers = workers
+        self.min_manufacturers = min_manufacturers
+        self.concurrent_engines = concurrent_engines
+        self._executor = None
+        # Request and job threads share the pool; only one of them may (re)start it.
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    @property
+    def executor(self):
+        """The live ProcessPoolExecutor, or None when the pool is not running."""
+        return self._executor
+
+    def start(self):
+        """Start every worker process and warm it up before the first request."""
+        with self._lock:
+            if self._executor is not None or self.workers < 2:
+                return
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           mp_context=multiprocessing.get_context(START_METHOD))
+            pids = set(executor.map(_warm_worker, range(self.workers * 2)))
+            self._executor = executor
+        log.info("pool.started", workers=self.workers, warmed=len(pids))
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def rebuild(self, broken):
+        """Replace the ``broken`` executor, unless another thread already has."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        log.warning("pool.broken", workers=self.workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def use_pool(self, n_manufacturers):
+        return self._executor is not None and n_manufacturers >= self.min_manufacturers
+
+    def compare(self, user, manufacturers, weights, options=None):
+        """compare_manufacturer for every manufacturer, results in request order."""
+        results = [None] * len(manufacturers)
+        for index, result in self.iter_compare(user, manufacturers, weights, options):
+            results[index] = result
+        return results
+
+    def iter_compare(self, user, manufacturers, weights, options=None):
+        """
+        Yield ``(index, comparison)`` for every manufacturer as soon as it
+        finishes, so callers can stream results instead of waiting for all.
+        """
+        pending = set(range(len(manufacturers)))
+        executor = self._executor
+        try:
+            if executor is not None and len(manufacturers) >= self.min_manufacturers:
+                futures = {
+                    executor.submit(flushed, compare_manufacturer, user, m, weights, None, options): i
+                    for i, m in enumerate(manufacturers)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    # result() raises if the worker died; keep the index pending until it succeeds.
+                    result = future.result()
+                    pending.discard(index)
+                    yield index, result
+                return
+            if self.concurrent_engines and executor is not None:
+                for index, result in self._iter_engines_concurrently(executor, user, manufacturers, weights,
+                                                                     options):
+                    pending.discard(index)
+                    yield index, result
+                return
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed). Rebuild the pool for the next
+            # request and finish this one in-process.
+            self.rebuild(executor)
+
+        for index in sorted(pending):
+            yield index, compare_manufacturer(user, manufacturers[index], weights, options=options)
+
+    def _iter_engines_concurrently(self, executor, user, manufacturers, weights, options):
+        # Queue every (manufacturer, engine) pair up front so all three engines
+        # of every manufacturer run side by side; a manufacturer is done (and
+        # leaves the caller's pending set) only once its last engine finishes,
+        # so one whose engines were cut off by a broken pool is recomputed.
+        futures = {
+            executor.submit(flushed, run_engine, name, user, m, weights, options): (i, name)
+            for i, m in enumerate(manufacturers) for name in ENGINES
+        }
+        finished = {}
+        for future in as_completed(futures):
+            index, name = futures[future]
+            engines = finished.setdefault(index, {})
+            engines[name] = future.result()
+            if len(engines) == len(ENGINES):
+                yield index, build_comparison(manufacturers[index], {name: engines[name] for name in ENGINES},
+                                              concurrent=True)
+
+
+POOL = ManufacturerPool()
\ No newline at end of file